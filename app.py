@@ -1,45 +1,71 @@
 # app.py
+import gc
 import dash
 from dash import Dash, html, dcc
 import dash_bootstrap_components as dbc
 
+from utils.collection import get_collection
+from utils.fakedata import ensure_watch_data
+from utils.lazyquery import AUCTIONS_DATASET
+from utils.rowindex import get_row_index
+from utils.search import get_search_index
+
 # ok so this could be a good start
 
-# Initialize the Dash app with a Bootstrap theme
-app = Dash(
-    __name__,
-    use_pages=True,
-    external_stylesheets=[dbc.themes.BOOTSTRAP, 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.5.0/font/bootstrap-icons.css'],
-    suppress_callback_exceptions=True
-)
+def create_app():
+    # The auction pages scan a generated dataset, write it on first start-up
+    # so page modules never touch the data root when imported
+    ensure_watch_data(AUCTIONS_DATASET)
+
+    # Initialize the Dash app with a Bootstrap theme
+    app = Dash(
+        __name__,
+        use_pages=True,
+        external_stylesheets=[dbc.themes.BOOTSTRAP, 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.5.0/font/bootstrap-icons.css'],
+        suppress_callback_exceptions=True
+    )
+
+    # Define the app layout
+    app.layout = dbc.Container(
+        fluid=True,
+        children=[
+            # Navigation Bar
+            dbc.NavbarSimple(
+                brand="Watch Auction Explorer",
+                brand_href="/",
+                color="dark",
+                dark=True,
+                children=[
+                    dbc.NavItem(dbc.NavLink("Watch Collection", href="/watch_collection")),
+                    dbc.NavItem(dbc.NavLink("Test", href="/watch_collection1")),
+                    #dbc.NavItem(dbc.NavLink("Trends & Analysis", href="/trends-analysis")),
+                    #dbc.NavItem(dbc.NavLink("Test Page", href="/test-page")),
+                ],
+            ),
+            # Main Content
+            dbc.Container(
+                id="page-content",
+                className="mt-4",
+                children=dash.page_container,
+            ),
+        ],
+    )
+    return app
 
-server = app.server
 
-# Define the app layout
-app.layout = dbc.Container(
-    fluid=True,
-    children=[
-        # Navigation Bar
-        dbc.NavbarSimple(
-            brand="Watch Auction Explorer",
-            brand_href="/",
-            color="dark",
-            dark=True,
-            children=[
-                dbc.NavItem(dbc.NavLink("Watch Collection", href="/watch_collection")),
-                dbc.NavItem(dbc.NavLink("Test", href="/watch_collection1")),
-                #dbc.NavItem(dbc.NavLink("Trends & Analysis", href="/trends-analysis")),
-                #dbc.NavItem(dbc.NavLink("Test Page", href="/test-page")),
-            ],
-        ),
-        # Main Content
-        dbc.Container(
-            id="page-content",
-            className="mt-4",
-            children=dash.page_container,
-        ),
-    ],
-)
+def preload_data():
+    # Load the auction dataset and everything the pages derive from it, then
+    # freeze it out of the garbage collector's reach. Called in the gunicorn
+    # master before forking (see gunicorn.conf.py) so every worker shares
+    # these pages copy-on-write instead of loading its own copy
+    get_collection()
+    get_search_index()
+    get_row_index()
+    gc.freeze()
+
+
+app = create_app()
+server = app.server
 
 if __name__ == "__main__":
     app.run_server(debug=True)
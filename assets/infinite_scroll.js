@@ -0,0 +1,44 @@
+// Infinite scroll for long lists: any element with the class
+// "infinite-scroll-sentinel" clicks the button named in its data-load-more
+// attribute whenever it scrolls into view. A list can have a sentinel at each
+// end; the button's callback adds a batch of items at that end, which pushes
+// the sentinel out of view again. Items dropped from the other end to keep
+// the list short are above or below the viewport, and the browser's scroll
+// anchoring keeps the visible items where they are.
+(function () {
+    var observed = new WeakSet();
+
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) {
+                return;
+            }
+            var button = document.getElementById(entry.target.dataset.loadMore);
+            if (!button || button.disabled) {
+                return;
+            }
+            button.click();
+            // Look again once the batch has had time to render, in case the
+            // sentinel is still visible (short batches or a tall screen)
+            observer.unobserve(entry.target);
+            setTimeout(function () {
+                observer.observe(entry.target);
+            }, 500);
+        });
+    }, {rootMargin: "400px"});
+
+    function observeSentinels() {
+        document.querySelectorAll(".infinite-scroll-sentinel").forEach(function (sentinel) {
+            if (!observed.has(sentinel)) {
+                observed.add(sentinel);
+                observer.observe(sentinel);
+            }
+        });
+    }
+
+    // Dash renders pages after this script runs, so pick sentinels up as they appear
+    new MutationObserver(observeSentinels).observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+    });
+})();
@@ -0,0 +1,14 @@
+# gunicorn -c gunicorn.conf.py app:server
+import multiprocessing
+
+bind = "0.0.0.0:8050"
+workers = multiprocessing.cpu_count() * 2 + 1
+
+# Import the app once in the master and fork the workers from it, so the
+# dataset loaded in when_ready is shared between them copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    from app import preload_data
+    preload_data()
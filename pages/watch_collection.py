@@ -1,65 +1,24 @@
 import dash
-from dash import html, dcc, Input, Output, State, ALL, callback
+from dash import html, dcc, Input, Output, State, ALL, Patch, callback
 import dash_bootstrap_components as dbc
-import pandas as pd
-import numpy as np
 import sys
 import os
 import time 
 import random 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.fakedata import generate_watch_data, read_fake_data
+from utils.datastore import get_dataset
+from utils.collection import get_collection
+from utils.search import get_search_index
+from utils.rowindex import get_row_index
+from utils.callbacks import triggered_id, triggered_index
+from utils.cards import collection_grid_cards
 import plotly.graph_objs as go
 
 dash.register_page(__name__, path="/watch_collection")
 
-# Load the data
-#watch_data_df = generate_watch_data(1000)
-
-watch_data_df = read_fake_data()
-
-# Replace NaNs in relevant columns with zero
-watch_data_df['sold_price'] = watch_data_df['sold_price'].fillna(0)
-watch_data_df['estimate_low'] = watch_data_df['estimate_low'].fillna(0)
-watch_data_df['previous_price'] = watch_data_df['previous_price'].fillna(0)
-
-# Calculate profit percentage using vectorized operations
-# Avoid division by zero by creating a mask
-watch_data_df['profit_percentage'] = np.where(
-    watch_data_df['estimate_low'] != 0,
-    ((watch_data_df['sold_price'] - watch_data_df['estimate_low']) / watch_data_df['estimate_low'] * 100).round(2),
-    0
-)
-
-# Determine 'is_popular' based on 'sold_price' in the top 25%
-threshold = watch_data_df['sold_price'].quantile(0.75)
-watch_data_df['is_popular'] = watch_data_df['sold_price'] >= threshold
-
-# Limit the number of watches displayed for performance
-display_df = watch_data_df.head(20)
-
-display_df['id'] = display_df.index 
-
-print(display_df[['brand', 'name', 'sold_price', 'previous_price']])
-
-# Portfolio summary calculations with safe handling of edge cases
-total_estimated_value = display_df['sold_price'].sum()
-previous_value = display_df['previous_price'].sum()
-change_value = total_estimated_value - previous_value
-
-# Calculate change percentage with safe division
-change_percentage = (change_value / previous_value * 100) if previous_value != 0 else 0
-
-number_of_watches = len(display_df)
-number_of_brands = display_df['brand'].nunique()
-
-# Add debug prints to verify calculations
-print(f"Debug Information:")
-print(f"Total Estimated Value: {total_estimated_value}")
-print(f"Previous Value: {previous_value}")
-print(f"Change Value: {change_value}")
-print(f"Change Percentage: {change_percentage}")
+# Number of search results rendered per page in the "Add Watch" modal
+SEARCH_PAGE_SIZE = 24
 
 portfolio_dates = ['2021-01', '2021-02', '2021-03', '2021-04', '2021-05']
 portfolio_values = [5000, 5500, 5300, 6000, 6200]
@@ -86,373 +45,327 @@ portfolio_sparkline_figure.update_layout(
     plot_bgcolor='rgba(0,0,0,0)',
 )
 
-layout = html.Div(
-    [
-        # Page Header
-        html.Div(
-            [
-                html.H2("Watch Collection", className="display-4 text-center mb-4"),
-                html.Hr(className="my-2"),
-            ],
-            className="mb-4",
-        ),
-        # Tabs and Add Watch Button
-        dbc.Row(
-            [
-                dbc.Col(
-                    dbc.Tabs(
-                        [
-                            dbc.Tab(label="My Watches", tab_id="my-watches", tabClassName="custom-tab"),
-                            dbc.Tab(label="Followed Watches", tab_id="followed-watches", tabClassName="custom-tab"),
-                        ],
-                        id="tabs",
-                        active_tab="my-watches",
-                        className="custom-tabs",
+def layout(**kwargs):
+    # Built per request from the shared collection data, which is only
+    # recomputed when the dataset file changes
+    collection = get_collection()
+
+    # Build the search index for the "Add Watch" modal before the first keystroke
+    get_search_index()
+
+    return html.Div(
+        [
+            # Page Header
+            html.Div(
+                [
+                    html.H2("Watch Collection", className="display-4 text-center mb-4"),
+                    html.Hr(className="my-2"),
+                ],
+                className="mb-4",
+            ),
+            # Tabs and Add Watch Button
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.Tabs(
+                            [
+                                dbc.Tab(label="My Watches", tab_id="my-watches", tabClassName="custom-tab"),
+                                dbc.Tab(label="Followed Watches", tab_id="followed-watches", tabClassName="custom-tab"),
+                            ],
+                            id="tabs",
+                            active_tab="my-watches",
+                            className="custom-tabs",
+                        ),
+                        width=9,
                     ),
-                    width=9,
-                ),
-                dbc.Col(
-                    dbc.Button(
-                        "+ Add Watch",
-                        color="primary",
-                        className="float-end",
-                        id="add-watch-button",
+                    dbc.Col(
+                        dbc.Button(
+                            "+ Add Watch",
+                            color="primary",
+                            className="float-end",
+                            id="add-watch-button",
+                        ),
+                        width=3,
+                        className="d-flex align-items-center justify-content-end",
                     ),
-                    width=3,
-                    className="d-flex align-items-center justify-content-end",
-                ),
-            ],
-            className="mb-4",
-        ),
-        # Content
-        html.Div(
-            id="content",
-            children=[
-                # Summary Section
-                dbc.Card(
-                    dbc.CardBody(
-                        dbc.Row(
-                            [
-                                # Left Column: Portfolio Information
-                                dbc.Col(
-                                    [
-                                        html.H5("Portfolio Summary", className="card-title"),
-                                        html.H2(f"£{total_estimated_value:,.2f}", className="card-text"),
-                                        html.P(
-                                            [
-                                                html.Span("Change: ", className="me-1"),
-                                                html.Span(
-                                                    f"{'+' if change_value >= 0 else '-'}£{abs(change_value):,.2f} ({change_percentage:.2f}%)",
-                                                    className="text-success" if change_value >= 0 else "text-danger",
-                                                ),
-                                                html.I(
-                                                    className=f"bi bi-arrow-{ 'up' if change_value >= 0 else 'down' }",
-                                                    style={"marginLeft": "5px"},
-                                                ),
-                                            ],
-                                            className="card-text",
+                ],
+                className="mb-4",
+            ),
+            # Content
+            html.Div(
+                id="content",
+                children=[
+                    # Summary Section
+                    dbc.Card(
+                        dbc.CardBody(
+                            dbc.Row(
+                                [
+                                    # Left Column: Portfolio Information
+                                    dbc.Col(
+                                        [
+                                            html.H5("Portfolio Summary", className="card-title"),
+                                            html.H2(f"£{collection.total_estimated_value:,.2f}", className="card-text"),
+                                            html.P(
+                                                [
+                                                    html.Span("Change: ", className="me-1"),
+                                                    html.Span(
+                                                        f"{'+' if collection.change_value >= 0 else '-'}£{abs(collection.change_value):,.2f} ({collection.change_percentage:.2f}%)",
+                                                        className="text-success" if collection.change_value >= 0 else "text-danger",
+                                                    ),
+                                                    html.I(
+                                                        className=f"bi bi-arrow-{ 'up' if collection.change_value >= 0 else 'down' }",
+                                                        style={"marginLeft": "5px"},
+                                                    ),
+                                                ],
+                                                className="card-text",
+                                            ),
+                                            html.P(f"Number of Watches: {collection.number_of_watches}", className="card-text"),
+                                            html.P(f"Different Brands: {collection.number_of_brands}", className="card-text"),
+                                        ],
+                                        width=8,
+                                    ),
+                                    # Right Column: Sparkline Chart
+                                    dbc.Col(
+                                        dcc.Graph(
+                                            figure=portfolio_sparkline_figure,
+                                            config={'displayModeBar': False},
+                                            style={"height": "150px"},
                                         ),
-                                        html.P(f"Number of Watches: {number_of_watches}", className="card-text"),
-                                        html.P(f"Different Brands: {number_of_brands}", className="card-text"),
-                                    ],
-                                    width=8,
-                                ),
-                                # Right Column: Sparkline Chart
-                                dbc.Col(
+                                        width=4,
+                                    ),
+                                ],
+                                align="center",
+                            )
+                        ),
+                        className="mb-5 shadow-sm",
+                    ),
+                    # Watch List
+                    html.Div(
+                        [
+                            html.H3("Your Watches", className="mb-4"),
+                            dbc.Container(
+                                [
+                                    dbc.Row(collection_grid_cards(collection.df))
+                                ],
+                                fluid=True,
+                            ),
+                        ]
+                    ),
+                    # Modal for watch details
+                    dbc.Modal(
+                        [
+                            dbc.ModalHeader(dbc.ModalTitle("Watch Details"), close_button=True),
+                            dbc.ModalBody(
+                                [
+                                    dbc.Row(
+                                        [
+                                            dbc.Col(
+                                                html.Img(
+                                                    id='modal-image',
+                                                    src='',
+                                                    className='img-fluid',
+                                                    style={"width": "100%"}
+                                                ),
+                                                width=12,
+                                            ),
+                                        ],
+                                        className="mb-3",
+                                    ),
+                                    html.H4(id='modal-name', className="mb-3"),
+                                    html.P(id='modal-description', className="mb-3"),
+                                    html.P(id='modal-prices', className="mb-3"),
                                     dcc.Graph(
-                                        figure=portfolio_sparkline_figure,
+                                        id='modal-chart',
                                         config={'displayModeBar': False},
-                                        style={"height": "150px"},
+                                        style={"height": "250px"},
                                     ),
-                                    width=4,
-                                ),
-                            ],
-                            align="center",
-                        )
+                                ]
+                            ),
+                        ],
+                        id='details-modal',
+                        size='lg',
+                        centered=True,
+                        is_open=False,
                     ),
-                    className="mb-5 shadow-sm",
-                ),
-                # Watch List
-                html.Div(
-                    [
-                        html.H3("Your Watches", className="mb-4"),
-                        dbc.Container(
-                            [
-                                dbc.Row(
-                                    [
-                                        dbc.Col(
-                                            dbc.Card(
-                                                dbc.Row(
-                                                    [
-                                                        dbc.Col(
-                                                            dbc.CardImg(
-                                                                src=row["image"],
-                                                                className="img-fluid rounded-start",
-                                                                style={
-                                                                    "height": "100px",
-                                                                    "object-fit": "cover",
-                                                                },
-                                                            ),
-                                                            width=4,
-                                                        ),
-                                                        dbc.Col(
-                                                            dbc.CardBody(
-                                                                [
-                                                                    html.Div(
-                                                                        [
-                                                                            html.H5(
-                                                                                row["name"],
-                                                                                className="card-title mb-0 me-2",
-                                                                            ),
-                                                                            dbc.Badge(
-                                                                                "Popular",
-                                                                                color="warning",
-                                                                                className="",
-                                                                                pill=True,
-                                                                            )
-                                                                            if row["is_popular"]
-                                                                            else None,
-                                                                        ],
-                                                                        className="d-flex align-items-center mb-2",
-                                                                    ),
-                                                                    html.P(
-                                                                        f"Estimated Value: £{row['sold_price']:,.2f}",
-                                                                        className="card-text mb-1",
-                                                                    ),
-                                                                    html.P(
-                                                                        f"Profit: +{row['profit_percentage']}%",
-                                                                        className="card-text text-success mb-1",
-                                                                    ),
-                                                                    dbc.Button(
-                                                                        "Details",
-                                                                        color="primary",
-                                                                        className="mt-1",
-                                                                        size="sm",
-                                                                        outline=True,
-                                                                        id={'type': 'details-button', 'index': str(row['id'])},
-                                                                    ),
-                                                                ],
-                                                                className="p-2",
-                                                            ),
-                                                            width=8,
-                                                        ),
-                                                    ],
-                                                    className="g-0 d-flex align-items-center",
-                                                ),
-                                                className="mb-3 shadow-sm",
+
+                    # Modal for adding watch to the collection by searching
+                    dbc.Modal(
+                        [
+                            dbc.ModalHeader(
+                                [
+                                    dbc.ModalTitle("Add Watch to Collection"),
+                                    dbc.Input(
+                                        type="search",
+                                        id="watch-search-input",
+                                        placeholder="Search for watches...",
+                                        className="mt-2",
+                                        debounce=True,
+                                    ),
+                                ],
+                                close_button=True,
+                            ),
+                            dbc.ModalBody(
+                                [
+                                    # Placeholder text for initial state before search results
+                                    html.Div(
+                                        [
+                                            html.I(
+                                                className="bi bi-search", 
+                                                style={
+                                                    "fontSize": "4rem",  # Increased from 2rem to 4rem
+                                                    "color": "gray",
+                                                    "marginBottom": "1rem",  # Added spacing between icon and text
+                                                    "opacity": "0.6"  # Added slight transparency for a softer look
+                                                }
                                             ),
-                                            width=12,
-                                            md=6,
-                                        )
-                                        for _, row in display_df.iterrows()
-                                    ]
-                                )
-                            ],
-                            fluid=True,
-                        ),
-                    ]
-                ),
-                # Modal for watch details
-                dbc.Modal(
-                    [
-                        dbc.ModalHeader(dbc.ModalTitle("Watch Details"), close_button=True),
-                        dbc.ModalBody(
-                            [
-                                dbc.Row(
-                                    [
-                                        dbc.Col(
-                                            html.Img(
-                                                id='modal-image',
-                                                src='',
-                                                className='img-fluid',
-                                                style={"width": "100%"}
+                                            html.P(
+                                                "Search by name, model, make, etc.",
+                                                className="text-muted",
+                                                style={
+                                                    "fontSize": "1.25rem",
+                                                    "margin": "0",  # Reset margin to ensure proper centering
+                                                    "padding": "0 1rem"  # Added horizontal padding for better text wrapping
+                                                }
                                             ),
-                                            width=12,
-                                        ),
-                                    ],
-                                    className="mb-3",
-                                ),
-                                html.H4(id='modal-name', className="mb-3"),
-                                html.P(id='modal-description', className="mb-3"),
-                                html.P(id='modal-prices', className="mb-3"),
-                                dcc.Graph(
-                                    id='modal-chart',
-                                    config={'displayModeBar': False},
-                                    style={"height": "250px"},
-                                ),
-                            ]
-                        ),
-                    ],
-                    id='details-modal',
-                    size='lg',
-                    centered=True,
-                    is_open=False,
-                ),
-
-                # Modal for adding watch to the collection by searching
-                dbc.Modal(
-                    [
-                        dbc.ModalHeader(
-                            [
-                                dbc.ModalTitle("Add Watch to Collection"),
-                                dbc.Input(
-                                    type="search",
-                                    id="watch-search-input",
-                                    placeholder="Search for watches...",
-                                    className="mt-2",
-                                    debounce=True,
-                                ),
-                            ],
-                            close_button=True,
-                        ),
-                        dbc.ModalBody(
-                            [
-                                # Placeholder text for initial state before search results
-                                html.Div(
-                                    [
-                                        html.I(
-                                            className="bi bi-search", 
-                                            style={
-                                                "fontSize": "4rem",  # Increased from 2rem to 4rem
-                                                "color": "gray",
-                                                "marginBottom": "1rem",  # Added spacing between icon and text
-                                                "opacity": "0.6"  # Added slight transparency for a softer look
-                                            }
-                                        ),
-                                        html.P(
-                                            "Search by name, model, make, etc.",
-                                            className="text-muted",
-                                            style={
-                                                "fontSize": "1.25rem",
-                                                "margin": "0",  # Reset margin to ensure proper centering
-                                                "padding": "0 1rem"  # Added horizontal padding for better text wrapping
-                                            }
-                                        ),
-                                    ],
-                                    id="search-placeholder",
-                                    style={
-                                        "textAlign": "center",
-                                        "marginTop": "4rem",  # Increased from 2rem to 4rem
-                                        "marginBottom": "4rem",  # Added bottom margin
-                                        "display": "flex",
-                                        "flexDirection": "column",
-                                        "alignItems": "center",
-                                        "justifyContent": "center",
-                                        "minHeight": "200px"  # Added minimum height for better vertical spacing
-                                    }
-                                ),
-                                # Search results container
-                                html.Div(
-                                    dbc.Container(
-                                        dbc.Row(id="search-results-container", className="g-3"),
-                                        fluid=True,
+                                        ],
+                                        id="search-placeholder",
+                                        style={
+                                            "textAlign": "center",
+                                            "marginTop": "4rem",  # Increased from 2rem to 4rem
+                                            "marginBottom": "4rem",  # Added bottom margin
+                                            "display": "flex",
+                                            "flexDirection": "column",
+                                            "alignItems": "center",
+                                            "justifyContent": "center",
+                                            "minHeight": "200px"  # Added minimum height for better vertical spacing
+                                        }
                                     ),
-                                    style={"maxHeight": "60vh", "overflowY": "auto"},
-                                    className="pe-2",
-                                ),
-                            ]
-                        ),
-                    ],
-                    id="add-watch-modal",
-                    size="xl",
-                    scrollable=True,
-                    is_open=False,
-                ),
-
-                # Modal for adding a selected watch to the user's collection
-                dbc.Modal(
-                    [
-                        dbc.ModalHeader(dbc.ModalTitle("Add Selected Watch to Collection"), close_button=True),
-                        dbc.ModalBody(
-                            [
-                                html.Div(
-                                    [
-                                        dbc.Row(
+                                    # Search results container
+                                    html.Div(
+                                        dbc.Container(
                                             [
-                                                dbc.Col(
-                                                    html.Img(
-                                                        id='collection-add-watch-image',
-                                                        src='',
-                                                        className='img-fluid rounded',
-                                                        style={"width": "100%"},
-                                                    ),
-                                                    width=4,
-                                                ),
-                                                dbc.Col(
-                                                    [
-                                                        html.H4(id='collection-add-watch-name', className="mb-2"),
-                                                        html.P(id='collection-add-watch-ref', className="text-muted"),
-                                                    ],
-                                                    width=8,
+                                                html.P(id="search-results-count", className="text-muted"),
+                                                dbc.Row(id="search-results-container", className="g-3"),
+                                                dbc.Button(
+                                                    "Load more",
+                                                    id="search-load-more",
+                                                    color="secondary",
+                                                    outline=True,
+                                                    className="w-100 mb-3",
+                                                    style={"display": "none"},
                                                 ),
                                             ],
-                                            className="mb-4",
+                                            fluid=True,
                                         ),
-                                        html.H5("Your Watch Details", className="mb-3"),
-                                        dbc.Row(
-                                            [
-                                                dbc.Col(
-                                                    [
-                                                        dbc.Label("Do you currently own this watch?"),
-                                                        dbc.Checklist(
-                                                            options=[{"label": "Yes, I own this watch", "value": True}],
-                                                            value=[],
-                                                            id="own-watch-checklist",
-                                                            switch=True,
-                                                        ),
-                                                        dbc.Label("Purchase Price (in £)", className="mt-3"),
-                                                        dbc.Input(
-                                                            type="number",
-                                                            id="bought-price-input",
-                                                            placeholder="Enter the price you bought this watch for",
-                                                        ),
-                                                    ],
-                                                    width=6,
-                                                ),
-                                                dbc.Col(
-                                                    [
-                                                        dbc.Label("Date Purchased", className="mt-0"),
-                                                        dcc.DatePickerSingle(
-                                                            id='date-bought-picker',
-                                                            placeholder="Select the date you bought the watch"
-                                                        ),
-                                                        dbc.Label("Condition", className="mt-3"),
-                                                        dbc.Select(
-                                                            id="condition-select",
-                                                            options=[
-                                                                {"label": "Brand New", "value": "Brand New"},
-                                                                {"label": "Like New", "value": "Like New"},
-                                                                {"label": "Used", "value": "Used"},
-                                                                {"label": "Vintage", "value": "Vintage"},
-                                                            ],
-                                                            placeholder="Select the watch's condition"
+                                        style={"maxHeight": "60vh", "overflowY": "auto"},
+                                        className="pe-2",
+                                    ),
+                                    # Query whose results are rendered and how many of them
+                                    dcc.Store(id="search-results-shown", data={"query": None, "shown": 0}),
+                                ]
+                            ),
+                        ],
+                        id="add-watch-modal",
+                        size="xl",
+                        scrollable=True,
+                        is_open=False,
+                    ),
+
+                    # Modal for adding a selected watch to the user's collection
+                    dbc.Modal(
+                        [
+                            dbc.ModalHeader(dbc.ModalTitle("Add Selected Watch to Collection"), close_button=True),
+                            dbc.ModalBody(
+                                [
+                                    html.Div(
+                                        [
+                                            dbc.Row(
+                                                [
+                                                    dbc.Col(
+                                                        html.Img(
+                                                            id='collection-add-watch-image',
+                                                            src='',
+                                                            className='img-fluid rounded',
+                                                            style={"width": "100%"},
                                                         ),
-                                                    ],
-                                                    width=6,
-                                                ),
-                                            ],
-                                            className="mb-3",
-                                        ),
-                                    ]
-                                ),
-                            ],
-                        ),
-                        dbc.ModalFooter(
-                            dbc.Button("Add to Collection", id="added-to-collection-button", color="primary")
-                        ),
-                    ],
-                    id="collection-add-modal",
-                    size="lg",
-                    centered=True,
-                    is_open=False,
-                ),
-                # A store to hold the selected watch data
-                dcc.Store(id="selected-watch-store"),
-            ],
-            className="container-fluid",
-        ),
-    ]
-)
+                                                        width=4,
+                                                    ),
+                                                    dbc.Col(
+                                                        [
+                                                            html.H4(id='collection-add-watch-name', className="mb-2"),
+                                                            html.P(id='collection-add-watch-ref', className="text-muted"),
+                                                        ],
+                                                        width=8,
+                                                    ),
+                                                ],
+                                                className="mb-4",
+                                            ),
+                                            html.H5("Your Watch Details", className="mb-3"),
+                                            dbc.Row(
+                                                [
+                                                    dbc.Col(
+                                                        [
+                                                            dbc.Label("Do you currently own this watch?"),
+                                                            dbc.Checklist(
+                                                                options=[{"label": "Yes, I own this watch", "value": True}],
+                                                                value=[],
+                                                                id="own-watch-checklist",
+                                                                switch=True,
+                                                            ),
+                                                            dbc.Label("Purchase Price (in £)", className="mt-3"),
+                                                            dbc.Input(
+                                                                type="number",
+                                                                id="bought-price-input",
+                                                                placeholder="Enter the price you bought this watch for",
+                                                            ),
+                                                        ],
+                                                        width=6,
+                                                    ),
+                                                    dbc.Col(
+                                                        [
+                                                            dbc.Label("Date Purchased", className="mt-0"),
+                                                            dcc.DatePickerSingle(
+                                                                id='date-bought-picker',
+                                                                placeholder="Select the date you bought the watch"
+                                                            ),
+                                                            dbc.Label("Condition", className="mt-3"),
+                                                            dbc.Select(
+                                                                id="condition-select",
+                                                                options=[
+                                                                    {"label": "Brand New", "value": "Brand New"},
+                                                                    {"label": "Like New", "value": "Like New"},
+                                                                    {"label": "Used", "value": "Used"},
+                                                                    {"label": "Vintage", "value": "Vintage"},
+                                                                ],
+                                                                placeholder="Select the watch's condition"
+                                                            ),
+                                                        ],
+                                                        width=6,
+                                                    ),
+                                                ],
+                                                className="mb-3",
+                                            ),
+                                        ]
+                                    ),
+                                ],
+                            ),
+                            dbc.ModalFooter(
+                                dbc.Button("Add to Collection", id="added-to-collection-button", color="primary")
+                            ),
+                        ],
+                        id="collection-add-modal",
+                        size="lg",
+                        centered=True,
+                        is_open=False,
+                    ),
+                    # A store to hold the selected watch data
+                    dcc.Store(id="selected-watch-store"),
+                ],
+                className="container-fluid",
+            ),
+        ]
+    )
+
 
 # Callbacks for the modal functionality
 
@@ -473,13 +386,11 @@ def toggle_modal(n_clicks_list, n_close, n_dismiss, is_open):
     if not ctx.triggered:
         return is_open, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
     else:
-        prop_id = ctx.triggered[0]['prop_id']
-        if 'details-button' in prop_id:
+        index = triggered_index('details-button')
+        if index is not None:
             # A 'Details' button was clicked
-            button_id = prop_id.split('.')[0]
-            index = eval(button_id)['index']
             # Retrieve the watch data based on the index
-            watch_row = display_df[display_df['id'] == int(index)].iloc[0]
+            watch_row = get_collection().rows.record(int(index))
 
             # Update modal content
             image_src = watch_row['image']
@@ -517,7 +428,7 @@ def toggle_modal(n_clicks_list, n_close, n_dismiss, is_open):
             )
 
             return True, image_src, name, description, prices, price_chart
-        elif 'details-modal' in prop_id:
+        elif triggered_id() == 'details-modal':
             # Modal close or dismiss was triggered
             return False, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
@@ -537,79 +448,96 @@ def toggle_add_watch_modal(n_clicks, n_close, n_dismiss, is_open):
         return not is_open
     return is_open
 
+def search_result_card(watch):
+    return dbc.Col(
+        dbc.Card(
+            [
+                dbc.CardImg(
+                    src=watch["image"],
+                    top=True,
+                    style={"height": "200px", "objectFit": "cover"},
+                ),
+                dbc.CardBody(
+                    [
+                        html.H5(watch["name"], className="card-title mb-1"),
+                        html.P(
+                            [
+                                html.Span(watch["brand"], className="text-muted"),
+                                html.Br(),
+                                html.Small(f"Ref: {watch.get('reference', '')}", className="text-muted"),
+                            ],
+                            className="mb-2",
+                        ),
+                        html.P(
+                            f"£{watch['sold_price']:,.2f}",
+                            className="font-weight-bold mb-2",
+                        ),
+                        dbc.Button(
+                            "Add to Collection",
+                            id={"type": "add-watch-to-collection-button", "index": watch["id"]},
+                            color="primary",
+                            size="sm",
+                            className="w-100",
+                        ),
+                    ],
+                    className="p-3",
+                ),
+            ],
+            className="h-100 shadow-sm hover-shadow",
+        ),
+        width=12,
+        md=6,
+        lg=3,
+        className="mb-3",
+    )
+
 @callback(
     [
         Output("search-results-container", "children"),
         Output("search-placeholder", "style"),
+        Output("search-results-count", "children"),
+        Output("search-load-more", "style"),
+        Output("search-results-shown", "data"),
     ],
     Input("watch-search-input", "value"),
+    Input("search-load-more", "n_clicks"),
+    State("search-results-shown", "data"),
 )
-def update_search_results(search_query):
-    # Generate example watches as a DataFrame and convert to list of dictionaries
-    example_watches_df = read_fake_data()
-    example_watches_df['id'] = example_watches_df.index 
-    example_watches = example_watches_df.to_dict(orient="records")  # Convert to list of dictionaries
-
+def update_search_results(search_query, load_more_clicks, shown):
     # If no search query, show placeholder text
     if not search_query:
-        return [], {"display": "block"}  # Show placeholder text
+        return [], {"display": "block"}, "", {"display": "none"}, {"query": None, "shown": 0}  # Show placeholder text
 
-    # Filter example watches based on search query
-    filtered_watches = [
-        watch for watch in example_watches
-        if search_query.lower() in (watch.get("name", "")).lower() or search_query.lower() in (watch.get("brand", "")).lower()
-    ]
+    # Look the query up in the prebuilt index, only the visible page of rows
+    # is ever turned into components
+    positions = get_search_index().search(search_query)
+
+    # Only append when the rendered cards belong to this query; an edited
+    # query arriving with a "Load more" click starts over at its first page
+    shown = shown or {}
+    load_more = dash.ctx.triggered_id == "search-load-more" and shown.get("query") == search_query
+    start = shown.get("shown", 0) if load_more else 0
+    page = positions[start:start + SEARCH_PAGE_SIZE]
+
+    filtered_watches = get_dataset().df.iloc[page].to_dict(orient="records")
 
     # Create cards for search results
-    search_cards = [
-        dbc.Col(
-            dbc.Card(
-                [
-                    dbc.CardImg(
-                        src=watch["image"],
-                        top=True,
-                        style={"height": "200px", "objectFit": "cover"},
-                    ),
-                    dbc.CardBody(
-                        [
-                            html.H5(watch["name"], className="card-title mb-1"),
-                            html.P(
-                                [
-                                    html.Span(watch["brand"], className="text-muted"),
-                                    html.Br(),
-                                    html.Small(f"Ref: {watch.get('reference', '')}", className="text-muted"),
-                                ],
-                                className="mb-2",
-                            ),
-                            html.P(
-                                f"£{watch['sold_price']:,.2f}",
-                                className="font-weight-bold mb-2",
-                            ),
-                            dbc.Button(
-                                "Add to Collection",
-                                id={"type": "add-watch-to-collection-button", "index": watch["id"]},
-                                color="primary",
-                                size="sm",
-                                className="w-100",
-                            ),
-                        ],
-                        className="p-3",
-                    ),
-                ],
-                className="h-100 shadow-sm hover-shadow",
-            ),
-            width=12,
-            md=6,
-            lg=3,
-            className="mb-3",
-        )
-        for watch in filtered_watches
-    ]
+    search_cards = [search_result_card(watch) for watch in filtered_watches]
+    if load_more:
+        # Append the next page to the cards already in the browser
+        results = Patch()
+        results.extend(search_cards)
+    else:
+        results = search_cards
+
+    shown = start + len(page)
+    count_text = f"Showing {shown:,} of {len(positions):,} watches" if len(positions) else "No watches found"
+    load_more_style = {"display": "block"} if shown < len(positions) else {"display": "none"}
 
     # Hide placeholder text if search results are found
-    placeholder_style = {"display": "none"} if filtered_watches else {"display": "block"}
+    placeholder_style = {"display": "none"} if len(positions) else {"display": "block"}
 
-    return search_cards, placeholder_style
+    return results, placeholder_style, count_text, load_more_style, {"query": search_query, "shown": shown}
 
 @callback(
     Output("collection-add-modal", "is_open"),
@@ -631,17 +559,11 @@ def open_collection_add_modal(n_clicks_list, n_close, n_dismiss, is_open, search
     if not ctx.triggered:
         return is_open, dash.no_update, dash.no_update, dash.no_update
 
-    prop_id = ctx.triggered[0]['prop_id']
-    if 'add-watch-to-collection-button' in prop_id:
-        # Identify which watch's button was clicked
-        triggered_id = eval(prop_id.split('.')[0])
-        watch_id = triggered_id['index']
-
-        # Retrieve watch data from the search
-        example_watches_df = read_fake_data()
-        example_watches_df['id'] = example_watches_df.index 
-        # Filter for that watch
-        selected_watch = example_watches_df.loc[example_watches_df['id'] == watch_id].to_dict('records')[0]
+    # Identify which watch's button was clicked
+    watch_id = triggered_index('add-watch-to-collection-button')
+    if watch_id is not None:
+        # Retrieve the watch straight from the dataset's id index
+        selected_watch = get_row_index().record(watch_id)
 
         # Fill the modal with watch data
         image_src = selected_watch['image']
@@ -649,7 +571,7 @@ def open_collection_add_modal(n_clicks_list, n_close, n_dismiss, is_open, search
         reference = f"Reference: {selected_watch.get('reference', 'N/A')}"
 
         return True, image_src, name, reference
-    elif 'collection-add-modal' in prop_id:
+    elif triggered_id() == 'collection-add-modal':
         # Modal closed or dismissed
         return False, dash.no_update, dash.no_update, dash.no_update
     return is_open, dash.no_update, dash.no_update, dash.no_update
@@ -1,30 +1,21 @@
 import dash
-from dash import html, dcc
+from dash import html, dcc, callback, Input, Output, State, Patch
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import pandas as pd
-from utils.fakedata import generate_watch_data
+from utils.cards import overview_list_cards
+from utils.collection import get_collection
+from utils.collection_query import DEFAULT_SORT
+from utils.callbacks import triggered_id
 
 dash.register_page(__name__, path="/watch_collection1")
 
-# Load the data
-watch_data_df = generate_watch_data(100)
+# Number of watch cards fetched per scroll step of the list
+WATCH_LIST_BATCH_SIZE = 30
 
-# Create 'name' column
-watch_data_df['name'] = watch_data_df['brand'] + ' ' + watch_data_df['collection']
-
-# Replace NaNs in 'sold_price' with zero
-watch_data_df['sold_price'] = watch_data_df['sold_price'].fillna(0)
-
-# Calculate 'profit_percentage' (assuming 'estimate_low' as the purchase price)
-watch_data_df['profit_percentage'] = (
-    (watch_data_df['sold_price'] - watch_data_df['estimate_low']) / watch_data_df['estimate_low'] * 100
-).round(2)
-
-# Determine 'is_popular' based on 'sold_price' in the top 25%
-watch_data_df['is_popular'] = watch_data_df['sold_price'] >= watch_data_df['sold_price'].quantile(0.75)
-
-# Limit the number of watches displayed for performance
-display_df = watch_data_df.head(20)
+# Batches kept on the page at once; scrolling past them drops the batch at the
+# far end, which is fetched again when scrolled back to
+WATCH_LIST_MAX_BATCHES = 5
 
 # Layout components
 header = html.Div(
@@ -58,134 +49,91 @@ tabs = html.Div(
     ],
 )
 
-overview_section = html.Div(
-    className="wt-overview-carousel mt-3 mb-2 mb-sm-5",
-    children=[
-        dbc.Row(
-            [
-                dbc.Col(
-                    dbc.Card(
-                        [
-                            dbc.CardBody(
-                                [
-                                    html.Div(
-                                        className="d-flex justify-content-between",
-                                        style={"alignItems": "center"},
-                                        children=[
-                                            html.Div(
-                                                [
-                                                    html.H2(
-                                                        f"£ {watch_data_df['sold_price'].sum():,.2f}",
-                                                        className="mt-0 mb-1",
-                                                    ),
-                                                    html.P("Current estimated value"),
-                                                ]
-                                            ),
-                                            html.Div(
-                                                [
-                                                    html.H2(
-                                                        f"+£ {(watch_data_df['sold_price'].sum() - watch_data_df['estimate_low'].sum()):,.2f}",
-                                                        className="mt-0 mb-1 text-success",
-                                                    ),
-                                                    html.P("Profit"),
-                                                ]
-                                            ),
-                                        ],
-                                    ),
-                                    dbc.Button(
-                                        [
-                                            "Performance in detail ",
-                                            html.I(className="bi bi-arrow-down"),
-                                        ],
-                                        color="link",
-                                        className="mt-5",
-                                    ),
-                                ]
-                            ),
-                        ],
-                        className="h-100 p-3 p-md-5 bg-light",
-                    ),
-                    width=12,
-                ),
-            ],
-            className="full-xs",
-        )
-    ],
-)
-
-watch_list_header = html.Div(
-    className="d-flex justify-content-between align-items-center mt-4 mt-md-6 mb-4",
-    children=[
-        html.H2(f"{len(display_df)} watches owned", className="h4 m-0"),
-        html.Div(
-            className="d-flex align-items-center",
-            children=[
-                html.Label("Sort by", className="mr-3 my-0 flex-shrink-0", htmlFor="sortWatchCollectionItems"),
-                dcc.Dropdown(
-                    id="sortWatchCollectionItems",
-                    options=[
-                        {"label": "Date added (newest first)", "value": "CreationDateDesc"},
-                        {"label": "Date purchased (newest first)", "value": "PurchaseDateDesc"},
-                        {"label": "Estimated value (high to low)", "value": "ValueDesc"},
-                        {"label": "Profit (high to low)", "value": "ValueDeltaDesc"},
-                        {"label": "Alphabetical (A-Z)", "value": "AlphaNumericAsc"},
-                    ],
-                    value="CreationDateDesc",
-                    clearable=False,
-                    className="wt-overview-sort-select",
-                ),
-            ],
-        ),
-    ],
-)
 
-# Generate watch cards
-watch_cards = []
-for _, row in display_df.iterrows():
-    card = html.A(
-        href=f"/view-item/{row['reference']}",
-        className="text-decoration-none",
-        children=dbc.Card(
-            className="rcard border-radius-large l-1 d-flex overflow-hidden wt-overview-list-item mb-3",
-            children=[
-                html.Div(
-                    className="overview-list-item-image img-circle overflow-hidden relative",
-                    children=html.Img(src=row["image"], alt="watch image", className="img-fluid"),
-                ),
-                html.Div(
-                    className="mx-3 d-flex flex-column justify-content-center flex-grow-1",
-                    children=[
-                        html.Div(
-                            className="pb-1",
-                            children=dbc.Badge(
-                                [html.I(className="bi bi-fire me-1"), "Very popular"],
-                                color="warning",
-                                className="watch-collection-hot-watch-badge border-radius-small",
-                            )
-                            if row["is_popular"]
-                            else None,
-                        ),
-                        html.Div(
-                            className="d-flex align-items-start mb-1",
-                            children=html.P(row["name"], className="mb-0"),
-                        ),
-                        html.Div(
-                            className="d-flex justify-content-between",
-                            children=[
-                                html.P(f"£ {row['sold_price']:,.2f}", className="h4 my-0"),
-                                dbc.Badge(
-                                    f"+{row['profit_percentage']}%",
-                                    color="success",
-                                    className="pill text-weight-normal border-radius-medium text-sm",
+def overview_section(collection):
+    return html.Div(
+        className="wt-overview-carousel mt-3 mb-2 mb-sm-5",
+        children=[
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.Card(
+                            [
+                                dbc.CardBody(
+                                    [
+                                        html.Div(
+                                            className="d-flex justify-content-between",
+                                            style={"alignItems": "center"},
+                                            children=[
+                                                html.Div(
+                                                    [
+                                                        html.H2(
+                                                            f"£ {collection.total_estimated_value:,.2f}",
+                                                            className="mt-0 mb-1",
+                                                        ),
+                                                        html.P("Current estimated value"),
+                                                    ]
+                                                ),
+                                                html.Div(
+                                                    [
+                                                        html.H2(
+                                                            f"+£ {collection.profit:,.2f}",
+                                                            className="mt-0 mb-1 text-success",
+                                                        ),
+                                                        html.P("Profit"),
+                                                    ]
+                                                ),
+                                            ],
+                                        ),
+                                        dbc.Button(
+                                            [
+                                                "Performance in detail ",
+                                                html.I(className="bi bi-arrow-down"),
+                                            ],
+                                            color="link",
+                                            className="mt-5",
+                                        ),
+                                    ]
                                 ),
                             ],
+                            className="h-100 p-3 p-md-5 bg-light",
                         ),
-                    ],
-                ),
-            ],
-        ),
+                        width=12,
+                    ),
+                ],
+                className="full-xs",
+            )
+        ],
+    )
+
+
+def watch_list_header(collection):
+    return html.Div(
+        className="d-flex justify-content-between align-items-center mt-4 mt-md-6 mb-4",
+        children=[
+            html.H2(f"{collection.number_of_watches} watches owned", className="h4 m-0"),
+            html.Div(
+                className="d-flex align-items-center",
+                children=[
+                    html.Label("Sort by", className="mr-3 my-0 flex-shrink-0", htmlFor="sortWatchCollectionItems"),
+                    dcc.Dropdown(
+                        id="sortWatchCollectionItems",
+                        options=[
+                            {"label": "Date added (newest first)", "value": "CreationDateDesc"},
+                            {"label": "Date purchased (newest first)", "value": "PurchaseDateDesc"},
+                            {"label": "Estimated value (high to low)", "value": "ValueDesc"},
+                            {"label": "Profit (high to low)", "value": "ValueDeltaDesc"},
+                            {"label": "Alphabetical (A-Z)", "value": "AlphaNumericAsc"},
+                        ],
+                        value=DEFAULT_SORT,
+                        clearable=False,
+                        className="wt-overview-sort-select",
+                    ),
+                ],
+            ),
+        ],
     )
-    watch_cards.append(card)
+
 
 # Add the "Add a watch" card
 add_watch_card = html.A(
@@ -208,14 +156,99 @@ add_watch_card = html.A(
         ],
     ),
 )
-watch_cards.append(add_watch_card)
-
-layout = html.Div(
-    [
-        header,
-        tabs,
-        overview_section,
-        watch_list_header,
-        html.Div(watch_cards, className="scroll-reload-list overview-list mt-3"),
-    ]
+
+def watch_list_batch(sort_key, offset):
+    # One batch of cards in the chosen sort order wrapped in a single element,
+    # so a whole batch can be added or dropped by its position in the list.
+    # Returns (batch, number of cards, total watches)
+    collection = get_collection()
+    positions, total = collection.query.page(sort_key, offset=offset, limit=WATCH_LIST_BATCH_SIZE)
+    return html.Div(overview_list_cards(collection.df.iloc[positions])), len(positions), total
+
+
+def watch_list_cursor(sort_key, start, end):
+    # The rendered window of the list: cards start..end of the sort order
+    return {"sort": sort_key, "start": start, "end": end}
+
+
+def layout(**kwargs):
+    # Built per request from the shared collection data, only the first batch
+    # of cards is rendered up front and the rest is fetched while scrolling
+    collection = get_collection()
+    first_batch, count, total = watch_list_batch(DEFAULT_SORT, 0)
+
+    return html.Div(
+        [
+            header,
+            tabs,
+            overview_section(collection),
+            watch_list_header(collection),
+            html.Div(
+                [
+                    # assets/infinite_scroll.js clicks the button named in
+                    # data-load-more when a sentinel comes into view: this one
+                    # brings back batches dropped off the top, the one below
+                    # the list fetches the next batch
+                    html.Div(className="infinite-scroll-sentinel", **{"data-load-more": "watch-list-load-previous"}),
+                    dbc.Button(id="watch-list-load-previous", disabled=True, style={"display": "none"}),
+                    html.Div([first_batch], id="watch-list"),
+                    html.Div(className="infinite-scroll-sentinel", **{"data-load-more": "watch-list-load-more"}),
+                    dbc.Button(
+                        id="watch-list-load-more",
+                        disabled=count >= total,
+                        style={"display": "none"},
+                    ),
+                    add_watch_card,
+                ],
+                className="scroll-reload-list overview-list mt-3",
+            ),
+            # Which part of the sorted order is currently rendered
+            dcc.Store(id="watch-list-cursor", data=watch_list_cursor(DEFAULT_SORT, 0, count)),
+        ]
+    )
+
+
+@callback(
+    Output("watch-list", "children"),
+    Output("watch-list-cursor", "data"),
+    Output("watch-list-load-more", "disabled"),
+    Output("watch-list-load-previous", "disabled"),
+    Input("sortWatchCollectionItems", "value"),
+    Input("watch-list-load-more", "n_clicks"),
+    Input("watch-list-load-previous", "n_clicks"),
+    State("watch-list-cursor", "data"),
+    prevent_initial_call=True,
 )
+def update_watch_list(sort_key, more_clicks, previous_clicks, cursor):
+    # The list is a window of at most WATCH_LIST_MAX_BATCHES batches: adding a
+    # batch at one end drops the one at the other end once it is full, so the
+    # page never holds more cards than that however far the user scrolls
+    trigger = triggered_id()
+    if trigger in ("watch-list-load-more", "watch-list-load-previous") and cursor and cursor["sort"] == sort_key:
+        start, end = cursor["start"], cursor["end"]
+        batches = -(-(end - start) // WATCH_LIST_BATCH_SIZE)
+        children = Patch()
+        if trigger == "watch-list-load-more":
+            batch, count, total = watch_list_batch(sort_key, end)
+            if not count:
+                raise PreventUpdate
+            children.append(batch)
+            end += count
+            if batches >= WATCH_LIST_MAX_BATCHES:
+                del children[0]
+                start += WATCH_LIST_BATCH_SIZE
+        else:
+            if start == 0:
+                raise PreventUpdate
+            batch, count, total = watch_list_batch(sort_key, start - WATCH_LIST_BATCH_SIZE)
+            children.prepend(batch)
+            start -= WATCH_LIST_BATCH_SIZE
+            if batches >= WATCH_LIST_MAX_BATCHES:
+                # Every batch but the last is full, so the window ends on a batch boundary
+                del children[batches]
+                end = start + WATCH_LIST_MAX_BATCHES * WATCH_LIST_BATCH_SIZE
+        return children, watch_list_cursor(sort_key, start, end), end >= total, start == 0
+
+    # A new sort order starts again from the top
+    batch, count, total = watch_list_batch(sort_key, 0)
+    return [batch], watch_list_cursor(sort_key, 0, count), count >= total, True
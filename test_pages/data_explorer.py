@@ -3,112 +3,185 @@ import dash
 from dash import html, dcc, callback, Output, Input, State
 import dash_bootstrap_components as dbc
 import dash_table
-import pandas as pd
 import plotly.express as px
-from utils.fakedata import generate_watch_data
+import plotly.graph_objects as go
+from utils.datastore import dataset_version, get_frame
+from utils.filtercache import FilterCache
+from utils.lazyquery import AUCTIONS_DATASET, auction_filters, query_auctions
+from utils.table_query import apply_filter_query, table_page
+from utils.binning import bar_trace, get_price_histogram, histogram
 
 dash.register_page(__name__, path="/test_page")
 
-# Load the data (Replace 'your_data.csv' with your actual data file)
-df = generate_watch_data(1000)
-
-# Define layout
-layout = dbc.Container([
-    html.H2("Data Explorer", className="text-center"),
-
-    # Filters Section
-    dbc.Card(
-        dbc.CardBody([
-            dbc.Row([
-                dbc.Col([
-                    dbc.Label("Brand"),
-                    dcc.Dropdown(
-                        options=[{'label': brand, 'value': brand} for brand in sorted(df['brand'].unique())],
-                        multi=True,
-                        placeholder="Select brands",
-                        id="brand-filter",
-                    ),
-                ], md=4),
-                dbc.Col([
-                    dbc.Label("Year Range"),
-                    dcc.RangeSlider(
-                        min=df['year'].min(),
-                        max=df['year'].max(),
-                        value=[df['year'].min(), df['year'].max()],
-                        marks={str(year): str(year) for year in range(df['year'].min(), df['year'].max()+1, 5)},
-                        id="year-filter",
-                    ),
-                ], md=4),
-                dbc.Col([
-                    dbc.Label("Sold Price Range"),
-                    dcc.RangeSlider(
-                        min=df['sold_price'].min(),
-                        max=df['sold_price'].max(),
-                        value=[df['sold_price'].min(), df['sold_price'].max()],
-                        marks={int(price): f"${int(price)}" for price in range(int(df['sold_price'].min()), int(df['sold_price'].max()), int((df['sold_price'].max()-df['sold_price'].min())/5))},
-                        id="price-filter",
-                    ),
-                ], md=4),
-            ], className="mb-3"),
-            dbc.Button("Apply Filters", id="apply-filters", color="primary"),
-        ]),
-        className="mb-4",
-    ),
-
-    # Data Table
-    dbc.Card(
-        dbc.CardBody([
-            dash_table.DataTable(
-                columns=[{"name": i, "id": i} for i in df.columns],
-                data=df.to_dict('records'),
-                id="data-table",
-                page_size=10,
-                style_table={'overflowX': 'auto'},
-            ),
-        ]),
-        className="mb-4",
-    ),
-
-    # Graphs Section
-    dbc.Card(
-        dbc.CardBody([
-            html.H3("Visualizations"),
-            dbc.Tabs([
-                dbc.Tab(dcc.Graph(id="price-dist-graph"), label="Price Distribution"),
-                dbc.Tab(dcc.Graph(id="brand-count-graph"), label="Watches per Brand"),
+# Rows per page of the table; only one page is ever sent to the browser
+TABLE_PAGE_SIZE = 10
+
+# The browser only holds a result key, in the explorer-result store: the
+# filters and the table's filter_query. The table pages through a scan of the
+# file with those filters, the graphs read their two columns from this cache
+EXPLORER_CACHE_SIZE = 8
+GRAPH_COLUMNS = ['sold_price', 'brand']
+explorer_results = FilterCache(EXPLORER_CACHE_SIZE)
+
+def result_query(result_key):
+    # Lazy scan of the rows a result key stands for
+    filters = auction_filters(**result_key['filters'])
+    return apply_filter_query(query_auctions(**dict(filters)), result_key['filter_query'])
+
+def filtered_auctions(result_key):
+    # The graph columns of the rows a result key stands for, collected once
+    # per key and version of the file. Keys carry the filters themselves, so
+    # one evicted from the cache, or never seen by this worker, is just rebuilt
+    key = (
+        dataset_version(AUCTIONS_DATASET),
+        auction_filters(**result_key['filters']),
+        result_key['filter_query'],
+    )
+    return explorer_results.get(key, lambda: result_query(result_key).select(GRAPH_COLUMNS).collect())
+
+def layout(**kwargs):
+    # Built when the page is requested, from the auction data generated at
+    # start-up (see app.create_app)
+    df = get_frame(AUCTIONS_DATASET)
+    return dbc.Container([
+        html.H2("Data Explorer", className="text-center"),
+
+        # Filters Section
+        dbc.Card(
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Brand"),
+                        dcc.Dropdown(
+                            options=[{'label': brand, 'value': brand} for brand in sorted(df['brand'].unique())],
+                            multi=True,
+                            placeholder="Select brands",
+                            id="brand-filter",
+                        ),
+                    ], md=4),
+                    dbc.Col([
+                        dbc.Label("Year Range"),
+                        dcc.RangeSlider(
+                            min=df['year'].min(),
+                            max=df['year'].max(),
+                            value=[df['year'].min(), df['year'].max()],
+                            marks={str(year): str(year) for year in range(df['year'].min(), df['year'].max()+1, 5)},
+                            id="year-filter",
+                        ),
+                    ], md=4),
+                    dbc.Col([
+                        dbc.Label("Sold Price Range"),
+                        dcc.RangeSlider(
+                            min=df['sold_price'].min(),
+                            max=df['sold_price'].max(),
+                            value=[df['sold_price'].min(), df['sold_price'].max()],
+                            marks={int(price): f"${int(price)}" for price in range(int(df['sold_price'].min()), int(df['sold_price'].max()), int((df['sold_price'].max()-df['sold_price'].min())/5))},
+                            id="price-filter",
+                        ),
+                    ], md=4),
+                ], className="mb-3"),
+                dbc.Button("Apply Filters", id="apply-filters", color="primary"),
+            ]),
+            className="mb-4",
+        ),
+
+        # Data Table
+        dbc.Card(
+            dbc.CardBody([
+                # Paged, sorted and filtered on the server, see update_table
+                dash_table.DataTable(
+                    columns=[{"name": i, "id": i} for i in df.columns],
+                    data=[],
+                    id="data-table",
+                    page_current=0,
+                    page_size=TABLE_PAGE_SIZE,
+                    page_action='custom',
+                    sort_action='custom',
+                    sort_mode='multi',
+                    sort_by=[],
+                    filter_action='custom',
+                    filter_query='',
+                    style_table={'overflowX': 'auto'},
+                ),
+                # Filters applied with the button above, as keyword arguments for query_auctions
+                dcc.Store(id="explorer-filters", data={}),
+                # Key of the current filtered result, see filtered_auctions
+                dcc.Store(id="explorer-result"),
+            ]),
+            className="mb-4",
+        ),
+
+        # Graphs Section
+        dbc.Card(
+            dbc.CardBody([
+                html.H3("Visualizations"),
+                dbc.Tabs([
+                    dbc.Tab(dcc.Graph(id="price-dist-graph"), label="Price Distribution"),
+                    dbc.Tab(dcc.Graph(id="brand-count-graph"), label="Watches per Brand"),
+                ]),
             ]),
-        ]),
-    ),
-], fluid=True)
+        ),
+    ], fluid=True)
 
 # Callbacks
 @callback(
-    Output("data-table", "data"),
+    Output("explorer-filters", "data"),
     Input("apply-filters", "n_clicks"),
     State("brand-filter", "value"),
     State("year-filter", "value"),
     State("price-filter", "value"),
     prevent_initial_call=True,
 )
-def update_table(n_clicks, selected_brands, year_range, price_range):
-    dff = df.copy()
-    if selected_brands:
-        dff = dff[dff['brand'].isin(selected_brands)]
-    dff = dff[(dff['year'] >= year_range[0]) & (dff['year'] <= year_range[1])]
-    dff = dff[(dff['sold_price'] >= price_range[0]) & (dff['sold_price'] <= price_range[1])]
-    return dff.to_dict('records')
+def apply_filters(n_clicks, selected_brands, year_range, price_range):
+    return dict(auction_filters(brands=selected_brands, years=year_range, prices=price_range))
+
+@callback(
+    Output("explorer-result", "data"),
+    Output("data-table", "page_current"),
+    Input("explorer-filters", "data"),
+    Input("data-table", "filter_query"),
+)
+def update_result(filters, filter_query):
+    # Hands the table and the graphs the new key, and starts the table over
+    # at its first page
+    return {'filters': filters or {}, 'filter_query': filter_query or ''}, 0
+
+@callback(
+    Output("data-table", "data"),
+    Output("data-table", "page_count"),
+    Input("data-table", "page_current"),
+    Input("data-table", "page_size"),
+    Input("data-table", "sort_by"),
+    Input("explorer-result", "data"),
+    prevent_initial_call=True,
+)
+def update_table(page_current, page_size, sort_by, result_key):
+    # Filtered, sorted and sliced by polars while scanning the parquet file,
+    # so only the visible page is read into memory and sent back
+    return table_page(result_query(result_key), page_current, page_size, sort_by)
 
 @callback(
     Output("price-dist-graph", "figure"),
     Output("brand-count-graph", "figure"),
-    Input("data-table", "data"),
+    Input("explorer-result", "data"),
+    prevent_initial_call=True,
 )
-def update_graphs(table_data):
-    dff = pd.DataFrame(table_data)
+def update_graphs(result_key):
+    # Reads two columns of the cached result instead of the table's records
+    dff = filtered_auctions(result_key).to_pandas()
 
-    # Price Distribution Histogram
-    fig_price_dist = px.histogram(
-        dff, x="sold_price", nbins=50, title="Sold Price Distribution"
+    # Price Distribution Histogram, binned here and sent as one bar per bin.
+    # Brand and year filters are answered from the precomputed histograms
+    filters = result_key['filters']
+    prices = get_price_histogram(AUCTIONS_DATASET)
+    if not result_key['filter_query'] and set(filters) <= {'brands', 'years', 'prices'} \
+            and prices.covers(filters.get('prices')):
+        edges, counts = prices.histogram(filters.get('brands'), filters.get('years'))
+    else:
+        edges, counts = histogram(dff['sold_price'].to_numpy())
+    fig_price_dist = go.Figure(bar_trace(edges, counts))
+    fig_price_dist.update_layout(
+        title="Sold Price Distribution", bargap=0, xaxis_title="sold_price", yaxis_title="count"
     )
 
     # Watches per Brand Bar Chart
@@ -3,124 +3,140 @@ from dash import html, dcc, callback, Output, Input
 import dash_bootstrap_components as dbc
 import pandas as pd
 import plotly.express as px
-from utils.fakedata import generate_watch_data
+from utils.datastore import get_dataset, get_frame
+from utils.auction_filter import get_auction_filter
+from utils.auction_cube import get_auction_cube
+from utils.price_series import get_price_series
+from utils.topk import top_k
+from utils.filtercache import FilterCache
+from utils.lazyquery import AUCTIONS_DATASET, auction_filters
 
 dash.register_page(__name__, path="/")
 
-# Load the data (Replace 'your_data.csv' with your actual data file)
-df = generate_watch_data(1000)
+# One filter change fires all four callbacks with the same inputs, those that
+# need the matching rows share their positions through this cache
+FILTER_CACHE_SIZE = 32
+filtered_positions = FilterCache(FILTER_CACHE_SIZE)
 
-def filter_data(df, selected_brands, selected_years, selected_auction_houses, box_papers):
-    dff = df.copy()
-    if selected_brands:
-        dff = dff[dff['brand'].isin(selected_brands)]
-    if selected_years:
-        dff = dff[(dff['year'] >= selected_years[0]) & (dff['year'] <= selected_years[1])]
-    if selected_auction_houses:
-        dff = dff[dff['auction_house'].isin(selected_auction_houses)]
-    if 'has_box' in box_papers:
-        dff = dff[dff['has_box'] == True]
-    if 'has_papers' in box_papers:
-        dff = dff[dff['has_papers'] == True]
-    return dff
+TOP_SALES_COUNT = 5
 
-layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            # Sidebar with filters
-            html.H5("Filters"),
-            html.Div([
-                dbc.Label("Brand"),
-                dcc.Dropdown(
-                    id='brand-filter',
-                    options=[{'label': brand, 'value': brand} for brand in sorted(df['brand'].unique())],
-                    multi=True
-                ),
-            ], className='mb-3'),
-            html.Div([
-                dbc.Label("Year"),
-                dcc.RangeSlider(
-                    id='year-filter',
-                    min=df['year'].min(),
-                    max=df['year'].max(),
-                    step=1,
-                    value=[df['year'].min(), df['year'].max()],
-                    marks={str(year): str(year) for year in range(df['year'].min(), df['year'].max()+1, 5)}
-                ),
-            ], className='mb-3'),
-            html.Div([
-                dbc.Label("Auction House"),
-                dcc.Dropdown(
-                    id='auction-house-filter',
-                    options=[{'label': house, 'value': house} for house in sorted(df['auction_house'].unique())],
-                    multi=True
-                ),
-            ], className='mb-3'),
-            html.Div([
-                dbc.Label("Box and Papers"),
-                dbc.Checklist(
-                    options=[
-                        {'label': 'Has Box', 'value': 'has_box'},
-                        {'label': 'Has Papers', 'value': 'has_papers'}
-                    ],
-                    value=[],
-                    id='box-papers-filter',
-                    inline=True
+def matching_rows(selected_brands, selected_years, selected_auction_houses, box_papers):
+    # (dataset, positions of the rows matching the filters); which rows match
+    # is worked out once per filter state from a single boolean mask
+    dataset = get_dataset(AUCTIONS_DATASET)
+    filters = auction_filters(
+        brands=selected_brands,
+        years=selected_years,
+        auction_houses=selected_auction_houses,
+        box_papers=box_papers,
+    )
+    positions = filtered_positions.get(
+        (dataset.version, filters),
+        lambda: get_auction_filter(AUCTIONS_DATASET).positions(**dict(filters)),
+    )
+    return dataset, positions
+
+def layout(**kwargs):
+    # Built when the page is requested, from the auction data generated at
+    # start-up (see app.create_app)
+    df = get_frame(AUCTIONS_DATASET)
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                # Sidebar with filters
+                html.H5("Filters"),
+                html.Div([
+                    dbc.Label("Brand"),
+                    dcc.Dropdown(
+                        id='brand-filter',
+                        options=[{'label': brand, 'value': brand} for brand in sorted(df['brand'].unique())],
+                        multi=True
+                    ),
+                ], className='mb-3'),
+                html.Div([
+                    dbc.Label("Year"),
+                    dcc.RangeSlider(
+                        id='year-filter',
+                        min=df['year'].min(),
+                        max=df['year'].max(),
+                        step=1,
+                        value=[df['year'].min(), df['year'].max()],
+                        marks={str(year): str(year) for year in range(df['year'].min(), df['year'].max()+1, 5)}
+                    ),
+                ], className='mb-3'),
+                html.Div([
+                    dbc.Label("Auction House"),
+                    dcc.Dropdown(
+                        id='auction-house-filter',
+                        options=[{'label': house, 'value': house} for house in sorted(df['auction_house'].unique())],
+                        multi=True
+                    ),
+                ], className='mb-3'),
+                html.Div([
+                    dbc.Label("Box and Papers"),
+                    dbc.Checklist(
+                        options=[
+                            {'label': 'Has Box', 'value': 'has_box'},
+                            {'label': 'Has Papers', 'value': 'has_papers'}
+                        ],
+                        value=[],
+                        id='box-papers-filter',
+                        inline=True
+                    ),
+                ], className='mb-3'),
+            ], width=3),
+            dbc.Col([
+                # First row: KPIs
+                dbc.Row([
+                    dbc.Col(dbc.Card(
+                        dbc.CardBody([
+                            html.H5("Total Watches Sold", className="card-title"),
+                            html.H2(id='total-watches', className="card-text")
+                        ])
+                    ), width=3),
+                    dbc.Col(dbc.Card(
+                        dbc.CardBody([
+                            html.H5("Total Sales", className="card-title"),
+                            html.H2(id='total-sales', className="card-text")
+                        ])
+                    ), width=3),
+                    dbc.Col(dbc.Card(
+                        dbc.CardBody([
+                            html.H5("Average Price", className="card-title"),
+                            html.H2(id='average-price', className="card-text")
+                        ])
+                    ), width=3),
+                    dbc.Col(dbc.Card(
+                        dbc.CardBody([
+                            html.H5("Top Brand", className="card-title"),
+                            html.H2(id='top-brand', className="card-text")
+                        ])
+                    ), width=3),
+                ]),
+                html.Br(),
+                # Second row: Charts
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='brand-distribution-chart')
+                    ], width=6),
+                    dbc.Col([
+                        dcc.Graph(id='average-price-over-time-chart')
+                    ], width=6),
+                ]),
+                html.Br(),
+                # Top Sales Carousel
+                html.H3("Top Sales"),
+                dbc.Carousel(
+                    items=[],
+                    id='top-sales-carousel',
+                    controls=True,
+                    indicators=True,
+                    interval=5000,
+                    ride="carousel"
                 ),
-            ], className='mb-3'),
-        ], width=3),
-        dbc.Col([
-            # First row: KPIs
-            dbc.Row([
-                dbc.Col(dbc.Card(
-                    dbc.CardBody([
-                        html.H5("Total Watches Sold", className="card-title"),
-                        html.H2(id='total-watches', className="card-text")
-                    ])
-                ), width=3),
-                dbc.Col(dbc.Card(
-                    dbc.CardBody([
-                        html.H5("Total Sales", className="card-title"),
-                        html.H2(id='total-sales', className="card-text")
-                    ])
-                ), width=3),
-                dbc.Col(dbc.Card(
-                    dbc.CardBody([
-                        html.H5("Average Price", className="card-title"),
-                        html.H2(id='average-price', className="card-text")
-                    ])
-                ), width=3),
-                dbc.Col(dbc.Card(
-                    dbc.CardBody([
-                        html.H5("Top Brand", className="card-title"),
-                        html.H2(id='top-brand', className="card-text")
-                    ])
-                ), width=3),
-            ]),
-            html.Br(),
-            # Second row: Charts
-            dbc.Row([
-                dbc.Col([
-                    dcc.Graph(id='brand-distribution-chart')
-                ], width=6),
-                dbc.Col([
-                    dcc.Graph(id='average-price-over-time-chart')
-                ], width=6),
-            ]),
-            html.Br(),
-            # Top Sales Carousel
-            html.H3("Top Sales"),
-            dbc.Carousel(
-                items=[],
-                id='top-sales-carousel',
-                controls=True,
-                indicators=True,
-                interval=5000,
-                ride="carousel"
-            ),
-        ], width=9)
+            ], width=9)
+        ])
     ])
-])
 
 @callback(
     Output('total-watches', 'children'),
@@ -133,17 +149,16 @@ layout = dbc.Container([
     Input('box-papers-filter', 'value')
 )
 def update_kpis(selected_brands, selected_years, selected_auction_houses, box_papers):
-    dff = filter_data(df, selected_brands, selected_years, selected_auction_houses, box_papers)
-    total_watches = len(dff)
-    total_sales = dff['sold_price'].sum()
-    average_price = dff['sold_price'].mean()
-    top_brand = dff['brand'].value_counts().idxmax() if not dff.empty else 'N/A'
+    # Summed from the pre-aggregated cube, no auction rows are touched
+    totals = get_auction_cube().query(
+        selected_brands, selected_years, selected_auction_houses, box_papers
+    )
 
     return (
-        f"{total_watches:,}",
-        f"${total_sales:,.2f}",
-        f"${average_price:,.2f}",
-        top_brand
+        f"{totals.count:,}",
+        f"${totals.sales:,.2f}",
+        f"${totals.average:,.2f}",
+        totals.top_brand() or 'N/A'
     )
 
 @callback(
@@ -154,10 +169,13 @@ def update_kpis(selected_brands, selected_years, selected_auction_houses, box_pa
     Input('box-papers-filter', 'value')
 )
 def update_brand_distribution_chart(selected_brands, selected_years, selected_auction_houses, box_papers):
-    dff = filter_data(df, selected_brands, selected_years, selected_auction_houses, box_papers)
+    totals = get_auction_cube().query(
+        selected_brands, selected_years, selected_auction_houses, box_papers
+    )
+    sold = totals.rows > 0
     fig = px.pie(
-        dff,
-        names='brand',
+        names=totals.brands[sold],
+        values=totals.rows[sold],
         title='Distribution of Watch Brands Sold'
     )
     return fig
@@ -170,11 +188,15 @@ def update_brand_distribution_chart(selected_brands, selected_years, selected_au
     Input('box-papers-filter', 'value')
 )
 def update_average_price_over_time_chart(selected_brands, selected_years, selected_auction_houses, box_papers):
-    dff = filter_data(df, selected_brands, selected_years, selected_auction_houses, box_papers)
-    dff['auction_date'] = pd.to_datetime(dff['auction_date'])
-    dff = dff.sort_values('auction_date')
-    avg_price_over_time = dff.groupby(dff['auction_date'].dt.to_period('M'))['sold_price'].mean().reset_index()
-    avg_price_over_time['auction_date'] = avg_price_over_time['auction_date'].dt.to_timestamp()
+    # Brand, year and auction house are read from the materialized series,
+    # box and papers average the matching rows over precomputed month buckets
+    prices = get_price_series('M')
+    if box_papers:
+        _, positions = matching_rows(selected_brands, selected_years, selected_auction_houses, box_papers)
+        dates, average = prices.series_for(positions)
+    else:
+        dates, average = prices.series(selected_brands, selected_years, selected_auction_houses)
+    avg_price_over_time = pd.DataFrame({'auction_date': dates.astype('datetime64[ns]'), 'sold_price': average})
 
     fig = px.line(
         avg_price_over_time,
@@ -193,15 +215,16 @@ def update_average_price_over_time_chart(selected_brands, selected_years, select
     Input('box-papers-filter', 'value')
 )
 def update_top_sales_carousel(selected_brands, selected_years, selected_auction_houses, box_papers):
-    dff = filter_data(df, selected_brands, selected_years, selected_auction_houses, box_papers)
-    top_sales = dff.sort_values(by='sold_price', ascending=False).head(5)
+    dataset, positions = matching_rows(selected_brands, selected_years, selected_auction_houses, box_papers)
+    sales = dataset.df
+    top_sales = top_k(sales['sold_price'].to_numpy(dtype=float), TOP_SALES_COUNT, positions)
     items = []
-    for index, row in top_sales.iterrows():
+    for index in top_sales:
         item = {
             'key': str(index),
-            'src': row['image'],
-            'header': f"{row['brand']} {row['collection']}",
-            'caption': f"Sold Price: ${row['sold_price']:,.2f}"
+            'src': sales['image'].iat[index],
+            'header': f"{sales['brand'].iat[index]} {sales['collection'].iat[index]}",
+            'caption': f"Sold Price: ${sales['sold_price'].iat[index]:,.2f}"
         }
         items.append(item)
     return items
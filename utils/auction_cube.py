@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from utils.datastore import get_dataset
+from utils.lazyquery import AUCTIONS_DATASET
+
+
+class CubeSlice:
+    # Totals for one filter state, per brand. Brands with no matching rows
+    # are kept with zero counts so arrays line up with brands
+
+    def __init__(self, brands, rows, priced, total, squares):
+        self.brands = brands
+        self.rows = rows
+        self.priced = priced
+        self.total = total
+        self.squares = squares
+
+    @property
+    def count(self):
+        return int(self.rows.sum())
+
+    @property
+    def sales(self):
+        return float(self.total.sum())
+
+    @property
+    def average(self):
+        # Mean sold price over rows that have one, NaN when there are none
+        priced = self.priced.sum()
+        return self.total.sum() / priced if priced else np.nan
+
+    @property
+    def std(self):
+        priced = self.priced.sum()
+        if not priced:
+            return np.nan
+        mean = self.total.sum() / priced
+        return np.sqrt(max(self.squares.sum() / priced - mean * mean, 0.0))
+
+    def top_brand(self):
+        # Brand with the most matching rows, None when nothing matches
+        return self.brands[int(self.rows.argmax())] if self.rows.any() else None
+
+
+class AuctionCube:
+    # sold_price pre-aggregated over brand x auction_house x year x has_box x
+    # has_papers: per cell the number of rows, the number with a price and the
+    # sum and sum of squares of the price. Any combination of the dashboard
+    # filters is a sub-block of the cube, so KPIs are summed from cells rather
+    # than from auction rows. Filtering on price is not possible here
+
+    def __init__(self, df):
+        brand_codes, self.brands = pd.factorize(df['brand'], sort=True)
+        house_codes, self.auction_houses = pd.factorize(df['auction_house'], sort=True)
+        self.years, year_codes = np.unique(df['year'].to_numpy(), return_inverse=True)
+        has_box = df['has_box'].to_numpy(dtype=bool).astype(np.intp)
+        has_papers = df['has_papers'].to_numpy(dtype=bool).astype(np.intp)
+
+        # Rows missing a brand or house are left out of the cube
+        keep = (brand_codes >= 0) & (house_codes >= 0)
+        self.shape = (len(self.brands), len(self.auction_houses), len(self.years), 2, 2)
+        cells = np.ravel_multi_index(
+            (brand_codes[keep], house_codes[keep], year_codes[keep], has_box[keep], has_papers[keep]),
+            self.shape,
+        )
+        prices = df['sold_price'].to_numpy(dtype=float)[keep]
+        priced = ~np.isnan(prices)
+        prices = np.where(priced, prices, 0.0)
+
+        size = int(np.prod(self.shape))
+        self.rows = np.bincount(cells, minlength=size).reshape(self.shape)
+        self.priced = np.bincount(cells, weights=priced, minlength=size).reshape(self.shape)
+        self.total = np.bincount(cells, weights=prices, minlength=size).reshape(self.shape)
+        self.squares = np.bincount(cells, weights=prices * prices, minlength=size).reshape(self.shape)
+
+    def _axis(self, categories, selected):
+        if not selected:
+            return slice(None)
+        return np.flatnonzero(categories.isin(list(selected)))
+
+    def _per_brand(self, cube, selections):
+        # Narrows one axis at a time, index arrays on several axes of a single
+        # lookup would be paired up instead of crossed
+        for axis, selection in enumerate(selections, start=1):
+            cube = cube[(slice(None),) * axis + (selection,)]
+        return cube.reshape(len(self.brands), -1).sum(axis=1)
+
+    def query(self, brands=None, years=None, auction_houses=None, box_papers=()):
+        # Same keyword filters as utils.auction_filter.AuctionFilter, minus prices
+        box_papers = box_papers or ()
+        brand_axis = self._axis(self.brands, brands)
+        selections = (
+            self._axis(self.auction_houses, auction_houses),
+            slice(
+                np.searchsorted(self.years, years[0], side='left'),
+                np.searchsorted(self.years, years[1], side='right'),
+            ) if years else slice(None),
+            slice(1, 2) if 'has_box' in box_papers else slice(None),
+            slice(1, 2) if 'has_papers' in box_papers else slice(None),
+        )
+        return CubeSlice(
+            np.asarray(self.brands)[brand_axis],
+            *(self._per_brand(cube, selections)[brand_axis]
+              for cube in (self.rows, self.priced, self.total, self.squares)),
+        )
+
+
+def get_auction_cube(name=AUCTIONS_DATASET):
+    return get_dataset(name).derived('auction_cube', lambda dataset: AuctionCube(dataset.df))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from utils.datastore import get_dataset
+from utils.lazyquery import AUCTIONS_DATASET
+
+
+class _Codes:
+    # A text column as integer codes into its distinct values. A filter on it
+    # looks each distinct value up once and then gathers the answer by code,
+    # instead of comparing every row's string
+
+    def __init__(self, values):
+        codes, self.categories = pd.factorize(values)
+        # Missing values get code -1, which picks the False appended to the table
+        self.codes = codes
+
+    def isin(self, selected):
+        table = np.append(self.categories.isin(list(selected)), False)
+        return table[self.codes]
+
+
+class _SortedIndex:
+    # Row positions ordered by a numeric column, so a range is two binary
+    # searches and a slice of positions rather than two comparisons per row
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.order = np.argsort(values, kind='stable')
+        self.sorted = values[self.order]
+
+    def between(self, low, high):
+        start = np.searchsorted(self.sorted, low, side='left')
+        stop = np.searchsorted(self.sorted, high, side='right')
+        return self.order[start:stop]
+
+
+class AuctionFilter:
+    # Answers the dashboard filters over one version of the auction frame with
+    # a single boolean mask: no copies of the frame, and one allocation per
+    # request however many filters are set. Takes the same keyword filters as
+    # utils.lazyquery.auction_predicates
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.brand = _Codes(df['brand'])
+        self.auction_house = _Codes(df['auction_house'])
+        self.year = _SortedIndex(df['year'].to_numpy())
+        self.sold_price = df['sold_price'].to_numpy()
+        self.has_box = df['has_box'].to_numpy(dtype=bool)
+        self.has_papers = df['has_papers'].to_numpy(dtype=bool)
+
+    def mask(self, brands=None, years=None, auction_houses=None, box_papers=(), prices=None):
+        # Boolean array over the frame's rows, or None when no filter is set
+        mask = None
+        if years:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.year.between(years[0], years[1])] = True
+        if brands:
+            mask = self._combine(mask, self.brand.isin(brands))
+        if auction_houses:
+            mask = self._combine(mask, self.auction_house.isin(auction_houses))
+        if box_papers and 'has_box' in box_papers:
+            mask = self._combine(mask, self.has_box)
+        if box_papers and 'has_papers' in box_papers:
+            mask = self._combine(mask, self.has_papers)
+        if prices:
+            mask = self._combine(mask, self.sold_price >= prices[0])
+            mask &= self.sold_price <= prices[1]
+        return mask
+
+    @staticmethod
+    def _combine(mask, clause):
+        # The first clause is copied once, every later one is and-ed in place
+        if mask is None:
+            return clause.copy()
+        mask &= clause
+        return mask
+
+    def positions(self, **filters):
+        # Row positions matching the filters, in frame order and read-only so
+        # they can be cached and shared
+        mask = self.mask(**filters)
+        positions = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+        positions.flags.writeable = False
+        return positions
+
+
+def get_auction_filter(name=AUCTIONS_DATASET):
+    return get_dataset(name).derived('auction_filter', lambda dataset: AuctionFilter(dataset.df))
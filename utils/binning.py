@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.datastore import get_dataset
+from utils.lazyquery import AUCTIONS_DATASET
+
+# Histograms are binned on the server and drawn as a bar per bin, so a figure
+# carries PRICE_BINS numbers rather than every price it counts
+
+PRICE_BINS = 50
+
+# Bins of the precomputed per brand and year histograms, merged and grouped
+# down to PRICE_BINS when drawn
+FINE_BINS = 1000
+
+
+def histogram(values, bins=PRICE_BINS):
+    # (bin edges, counts) of the non-NaN values, both empty when there are none
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    counts, edges = np.histogram(values, bins=bins)
+    return edges, counts
+
+
+def coarsen(edges, counts, bins=PRICE_BINS):
+    # Groups neighbouring bins of a fine histogram into at most `bins` bins,
+    # after trimming empty bins off both ends so the range fits the data
+    filled = np.flatnonzero(counts)
+    if not len(filled):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    counts = counts[filled[0]:filled[-1] + 1]
+    edges = edges[filled[0]:filled[-1] + 2]
+    group = -(-len(counts) // bins)
+    padding = -len(counts) % group
+    counts = np.append(counts, np.zeros(padding, dtype=counts.dtype))
+    # Edges of the padding bins continue at the fine bin width
+    width = edges[1] - edges[0]
+    edges = np.append(edges, edges[-1] + width * np.arange(1, padding + 1))
+    return edges[::group], counts.reshape(-1, group).sum(axis=1)
+
+
+def bar_trace(edges, counts, **kwargs):
+    # A histogram as a bar per bin, centred on the bin and as wide as it
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        **kwargs,
+    )
+
+
+class PriceHistogram:
+    # Fine histograms of sold_price per brand and year over one shared set of
+    # edges. Histograms for any set of brands and year range are sums of
+    # these, exact as long as prices are not filtered to part of their range
+
+    def __init__(self, df, bins=FINE_BINS):
+        prices = df['sold_price'].to_numpy(dtype=float)
+        priced = ~np.isnan(prices)
+        brand_codes, self.brands = pd.factorize(df['brand'], sort=True)
+        self.years, year_codes = np.unique(df['year'].to_numpy(), return_inverse=True)
+
+        self.low = float(prices[priced].min()) if priced.any() else 0.0
+        self.high = float(prices[priced].max()) if priced.any() else 1.0
+        self.edges = np.linspace(self.low, self.high, bins + 1)
+        # Bins are closed on the right for the last one, like np.histogram
+        price_bins = np.clip(np.searchsorted(self.edges, prices, side='right') - 1, 0, bins - 1)
+
+        keep = priced & (brand_codes >= 0)
+        self.shape = (len(self.brands), len(self.years), bins)
+        cells = np.ravel_multi_index(
+            (brand_codes[keep], year_codes[keep], price_bins[keep]), self.shape
+        )
+        self.counts = np.bincount(cells, minlength=int(np.prod(self.shape))).reshape(self.shape)
+
+    def covers(self, prices):
+        # Whether a price filter keeps every price, so these counts still apply
+        return not prices or (prices[0] <= self.low and prices[1] >= self.high)
+
+    def histogram(self, brands=None, years=None, bins=PRICE_BINS):
+        counts = self.counts
+        if brands:
+            counts = counts[np.flatnonzero(self.brands.isin(list(brands)))]
+        if years:
+            counts = counts[:, np.searchsorted(self.years, years[0], side='left'):
+                            np.searchsorted(self.years, years[1], side='right')]
+        return coarsen(self.edges, counts.sum(axis=(0, 1)), bins)
+
+
+def get_price_histogram(name=AUCTIONS_DATASET):
+    return get_dataset(name).derived('price_histogram', lambda dataset: PriceHistogram(dataset.df))
@@ -0,0 +1,20 @@
+import dash
+
+
+def triggered_id():
+    # The id of the component that fired the current callback, as Dash already
+    # decoded it: a dict for pattern-matching ids, a string otherwise, None on
+    # the initial call
+    return dash.ctx.triggered_id
+
+
+def triggered_index(component_type):
+    # The 'index' of the pattern-matching component of this type that fired
+    # the callback, or None. Also None when the triggering value is empty,
+    # which is what Dash sends when new buttons are rendered rather than clicked
+    trigger = dash.ctx.triggered_id
+    if not isinstance(trigger, dict) or trigger.get('type') != component_type:
+        return None
+    if not dash.ctx.triggered[0]['value']:
+        return None
+    return trigger.get('index')
@@ -0,0 +1,126 @@
+from dash import html
+import dash_bootstrap_components as dbc
+
+# Watch cards for the collection pages, built straight from column arrays.
+# Everything that is the same on every card (badges, styles) is created once
+# here and shared, so a card only costs the components that carry its own data
+
+GRID_IMAGE_STYLE = {"height": "100px", "object-fit": "cover"}
+
+POPULAR_BADGE = dbc.Badge("Popular", color="warning", className="", pill=True)
+
+VERY_POPULAR_BADGE = dbc.Badge(
+    [html.I(className="bi bi-fire me-1"), "Very popular"],
+    color="warning",
+    className="watch-collection-hot-watch-badge border-radius-small",
+)
+
+
+def _columns(df, *names):
+    return [df[name].to_numpy() for name in names]
+
+
+def collection_grid_card(watch_id, image, name, is_popular, sold_price, profit_percentage):
+    return dbc.Col(
+        dbc.Card(
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.CardImg(
+                            src=image,
+                            className="img-fluid rounded-start",
+                            style=GRID_IMAGE_STYLE,
+                        ),
+                        width=4,
+                    ),
+                    dbc.Col(
+                        dbc.CardBody(
+                            [
+                                html.Div(
+                                    [
+                                        html.H5(name, className="card-title mb-0 me-2"),
+                                        POPULAR_BADGE if is_popular else None,
+                                    ],
+                                    className="d-flex align-items-center mb-2",
+                                ),
+                                html.P(
+                                    f"Estimated Value: £{sold_price:,.2f}",
+                                    className="card-text mb-1",
+                                ),
+                                html.P(
+                                    f"Profit: +{profit_percentage}%",
+                                    className="card-text text-success mb-1",
+                                ),
+                                dbc.Button(
+                                    "Details",
+                                    color="primary",
+                                    className="mt-1",
+                                    size="sm",
+                                    outline=True,
+                                    id={'type': 'details-button', 'index': str(watch_id)},
+                                ),
+                            ],
+                            className="p-2",
+                        ),
+                        width=8,
+                    ),
+                ],
+                className="g-0 d-flex align-items-center",
+            ),
+            className="mb-3 shadow-sm",
+        ),
+        width=12,
+        md=6,
+    )
+
+
+def collection_grid_cards(df):
+    # "Your Watches" grid on the watch collection page
+    columns = _columns(df, 'id', 'image', 'name', 'is_popular', 'sold_price', 'profit_percentage')
+    return [collection_grid_card(*values) for values in zip(*columns)]
+
+
+def overview_list_card(reference, image, name, is_popular, sold_price, profit_percentage):
+    return html.A(
+        href=f"/view-item/{reference}",
+        className="text-decoration-none",
+        children=dbc.Card(
+            className="rcard border-radius-large l-1 d-flex overflow-hidden wt-overview-list-item mb-3",
+            children=[
+                html.Div(
+                    className="overview-list-item-image img-circle overflow-hidden relative",
+                    children=html.Img(src=image, alt="watch image", className="img-fluid"),
+                ),
+                html.Div(
+                    className="mx-3 d-flex flex-column justify-content-center flex-grow-1",
+                    children=[
+                        html.Div(
+                            className="pb-1",
+                            children=VERY_POPULAR_BADGE if is_popular else None,
+                        ),
+                        html.Div(
+                            className="d-flex align-items-start mb-1",
+                            children=html.P(name, className="mb-0"),
+                        ),
+                        html.Div(
+                            className="d-flex justify-content-between",
+                            children=[
+                                html.P(f"£ {sold_price:,.2f}", className="h4 my-0"),
+                                dbc.Badge(
+                                    f"+{profit_percentage}%",
+                                    color="success",
+                                    className="pill text-weight-normal border-radius-medium text-sm",
+                                ),
+                            ],
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    )
+
+
+def overview_list_cards(df):
+    # Scrolling list of owned watches on the overview page
+    columns = _columns(df, 'reference', 'image', 'name', 'is_popular', 'sold_price', 'profit_percentage')
+    return [overview_list_card(*values) for values in zip(*columns)]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from utils.datastore import DEFAULT_DATASET, get_dataset, read_only
+from utils.rowindex import RowIndex
+from utils.collection_query import CollectionQuery
+
+
+class Collection:
+    # The watch collection prepared for the collection pages: display columns,
+    # id lookup, sort orders and the portfolio summary. Built once per version
+    # of the dataset, so page layouts and callbacks only read from it
+
+    def __init__(self, dataset):
+        df = dataset.df.copy(deep=False)
+
+        if 'name' not in df.columns:
+            df['name'] = df['brand'] + ' ' + df['collection']
+
+        # Replace NaNs in relevant columns with zero
+        df['sold_price'] = df['sold_price'].fillna(0)
+        df['estimate_low'] = df['estimate_low'].fillna(0)
+        df['previous_price'] = df['previous_price'].fillna(0)
+
+        # Calculate profit percentage using vectorized operations
+        # Avoid division by zero by creating a mask
+        df['profit_percentage'] = np.where(
+            df['estimate_low'] != 0,
+            ((df['sold_price'] - df['estimate_low']) / df['estimate_low'] * 100).round(2),
+            0
+        )
+
+        # Determine 'is_popular' based on 'sold_price' in the top 25%
+        threshold = df['sold_price'].quantile(0.75)
+        df['is_popular'] = df['sold_price'] >= threshold
+
+        # Shared by every page and callback, so read-only like the dataset
+        self.df = df = read_only(df)
+        self.rows = RowIndex(df)
+        self.query = CollectionQuery(df)
+
+        # Portfolio summary calculations with safe handling of edge cases
+        self.total_estimated_value = df['sold_price'].sum()
+        self.previous_value = df['previous_price'].sum()
+        self.change_value = self.total_estimated_value - self.previous_value
+        self.change_percentage = (
+            self.change_value / self.previous_value * 100 if self.previous_value != 0 else 0
+        )
+        self.profit = df['sold_price'].sum() - df['estimate_low'].sum()
+        self.number_of_watches = len(df)
+        self.number_of_brands = df['brand'].nunique()
+
+
+def get_collection(name=DEFAULT_DATASET):
+    return get_dataset(name).derived('collection', Collection)
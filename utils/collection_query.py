@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Sort options of the collection list, value -> (column, ascending). A missing
+# column falls back to row order, the frame is assumed to be in insertion order
+SORT_ORDERS = {
+    'CreationDateDesc': ('added', False),
+    'PurchaseDateDesc': ('auction_date', False),
+    'ValueDesc': ('sold_price', False),
+    'ValueDeltaDesc': ('profit_percentage', False),
+    'AlphaNumericAsc': ('name', True),
+}
+
+DEFAULT_SORT = 'CreationDateDesc'
+
+
+class CollectionQuery:
+    # Serves sorted, paged slices of a collection frame. Each sort order is
+    # argsorted once into a permutation of row positions and kept, so a
+    # request is a slice of that permutation rather than a sort of the frame
+
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def order(self, sort_key):
+        try:
+            return self._orders[sort_key]
+        except KeyError:
+            pass
+        with self._lock:
+            if sort_key not in self._orders:
+                self._orders[sort_key] = self._build_order(sort_key)
+            return self._orders[sort_key]
+
+    def _build_order(self, sort_key):
+        column, ascending = SORT_ORDERS.get(sort_key, SORT_ORDERS[DEFAULT_SORT])
+        if column not in self.df.columns:
+            order = np.arange(len(self.df))
+            order = order if ascending else order[::-1].copy()
+        else:
+            values = self.df[column].reset_index(drop=True)
+            key = (lambda s: s.str.lower()) if pd.api.types.is_string_dtype(values) else None
+            order = values.sort_values(
+                ascending=ascending, kind='stable', na_position='last', key=key
+            ).index.to_numpy()
+        order.flags.writeable = False  # shared by every request
+        return order
+
+    def page(self, sort_key, offset=0, limit=50):
+        # Returns (row positions for the page, total rows)
+        order = self.order(sort_key)
+        return order[offset:offset + limit], len(order)
@@ -0,0 +1,178 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Folder holding the parquet datasets, set WATCH_DATA_ROOT to point elsewhere
+DATA_ROOT = os.environ.get(
+    'WATCH_DATA_ROOT',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'),
+)
+
+DEFAULT_DATASET = 'fakedata'
+
+# How datasets are loaded, set WATCH_DATA_BACKEND to choose:
+#   'parquet' decodes the parquet file into memory
+#   'arrow'   converts it once to an uncompressed Arrow IPC file beside it and
+#             memory-maps that, so columns are only paged in when touched
+DATA_BACKEND = os.environ.get('WATCH_DATA_BACKEND', 'parquet')
+
+# Text columns are loaded as Arrow-backed strings rather than one Python
+# object per cell: smaller, and never written to by refcounting, so a frame
+# loaded before gunicorn forks stays shared with every worker
+_ARROW_STRINGS = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.large_string(): pd.StringDtype('pyarrow'),
+}
+
+# Dates are written to the parquet files as ISO text; they are parsed once
+# when a dataset is loaded so callbacks get datetime64 columns
+DATE_COLUMNS = ('auction_date',)
+
+_datasets = {}
+_lock = threading.Lock()
+
+
+def read_only(df):
+    # The same frame with its NumPy column arrays marked read-only, without
+    # copying them. A frame shared between callbacks must never be changed in
+    # place; this makes an in-place write (.loc, .iloc, .at) raise instead of
+    # silently changing what every other callback sees. Arrow-backed columns
+    # are immutable already
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, np.dtype):
+            column = column.to_numpy()
+            column.flags.writeable = False
+        columns[name] = column
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+class Dataset:
+    # One loaded version of a parquet file plus anything built from it.
+    # version is the file's (mtime, size) so derived data can be keyed on it.
+    # df is shared by every caller and must not be modified, its columns are
+    # read-only (see read_only); use get_frame for a frame to change
+
+    def __init__(self, name, path, df, version):
+        self.name = name
+        self.path = path
+        self.df = df
+        self.version = version
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key, builder):
+        # Builds builder(self) once for this version of the data and keeps it,
+        # a changed file gives a new Dataset so nothing stale is ever returned
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self)
+            return self._derived[key]
+
+
+def set_data_root(path):
+    global DATA_ROOT
+    with _lock:
+        DATA_ROOT = path
+        _datasets.clear()
+
+
+def dataset_path(name=DEFAULT_DATASET):
+    return os.path.join(DATA_ROOT, f"{name}.parquet")
+
+
+def _read_parquet(path, version):
+    return pq.read_table(path).to_pandas(types_mapper=_ARROW_STRINGS.get)
+
+
+def arrow_path(path):
+    return os.path.splitext(path)[0] + '.arrow'
+
+
+def _ensure_arrow_file(path, version):
+    # The Arrow file records the parquet version it was converted from and is
+    # rebuilt when that no longer matches. Row groups are streamed across, so
+    # converting never needs the whole dataset in memory
+    target = arrow_path(path)
+    stamp = f"{version[0]}:{version[1]}".encode()
+    try:
+        with pa.memory_map(target) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        if metadata.get(b'source_version') == stamp:
+            return target
+    except (OSError, pa.ArrowInvalid):
+        pass
+
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    schema = schema.with_metadata({**(schema.metadata or {}), b'source_version': stamp})
+    # Write beside the target and swap it in, so other workers never map a half-written file
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in parquet_file.iter_batches():
+            writer.write_batch(batch)
+    os.replace(tmp, target)
+    return target
+
+
+def _read_arrow(path, version):
+    # Zero-copy: Arrow strings and null-free numeric columns point straight
+    # into the mapped file, nothing is read until a column is used
+    source = pa.memory_map(_ensure_arrow_file(path, version))
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=_ARROW_STRINGS.get, split_blocks=True)
+
+
+_READERS = {
+    'parquet': _read_parquet,
+    'arrow': _read_arrow,
+}
+
+
+def _parse_dates(df):
+    for column in DATE_COLUMNS:
+        if column in df.columns and pd.api.types.is_string_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], format='ISO8601', errors='coerce')
+    return df
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def dataset_version(name=DEFAULT_DATASET):
+    # The (mtime, size) a dataset's file has right now, for keying caches of
+    # results computed from it without loading it
+    return _file_version(dataset_path(name))
+
+
+def get_dataset(name=DEFAULT_DATASET):
+    # Loads the parquet file once per process and reloads it only when its
+    # mtime or size changes, so callbacks don't touch the disk on every request
+    path = dataset_path(name)
+    version = _file_version(path)
+    dataset = _datasets.get(name)
+    if dataset is not None and dataset.path == path and dataset.version == version:
+        return dataset
+    with _lock:
+        dataset = _datasets.get(name)
+        if dataset is None or dataset.path != path or dataset.version != version:
+            df = read_only(_parse_dates(_READERS[DATA_BACKEND](path, version)))
+            dataset = Dataset(name, path, df, version)
+            _datasets[name] = dataset
+        return dataset
+
+
+def get_frame(name=DEFAULT_DATASET):
+    # A cheap shallow copy of the cached frame. Columns can be added to it or
+    # replaced; changing values in place needs a .copy() of the column first
+    return get_dataset(name).df.copy(deep=False)
@@ -1,132 +1,259 @@
-import random
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-# this should not be taking this long to do 
-
-def generate_watch_data(num_records=100):
-    # Watch brands and their typical collections/models
-
-    watch_data = {
-        'Rolex': {
-            'collections': ['Submariner', 'Daytona', 'DateJust', 'GMT-Master II', 'Day-Date', 'Explorer', 'Air-King'],
-            'min_price': 5000,
-            'max_price': 100000
-        },
-        'Patek Philippe': {
-            'collections': ['Nautilus', 'Calatrava', 'Aquanaut', 'Grand Complications', 'Golden Ellipse'],
-            'min_price': 20000,
-            'max_price': 500000
-        },
-        'Audemars Piguet': {
-            'collections': ['Royal Oak', 'Royal Oak Offshore', 'Code 11.59', 'Millenary'],
-            'min_price': 15000,
-            'max_price': 200000
-        },
-        'Omega': {
-            'collections': ['Speedmaster', 'Seamaster', 'Constellation', 'De Ville'],
-            'min_price': 3000,
-            'max_price': 50000
-        },
-        'Cartier': {
-            'collections': ['Tank', 'Santos', 'Ballon Bleu', 'Pasha', 'Drive'],
-            'min_price': 4000,
-            'max_price': 80000
-        }
+from utils.datastore import dataset_path, get_frame
+
+# Watch brands and their typical collections/models
+WATCH_BRANDS = {
+    'Rolex': {
+        'collections': ['Submariner', 'Daytona', 'DateJust', 'GMT-Master II', 'Day-Date', 'Explorer', 'Air-King'],
+        'min_price': 5000,
+        'max_price': 100000
+    },
+    'Patek Philippe': {
+        'collections': ['Nautilus', 'Calatrava', 'Aquanaut', 'Grand Complications', 'Golden Ellipse'],
+        'min_price': 20000,
+        'max_price': 500000
+    },
+    'Audemars Piguet': {
+        'collections': ['Royal Oak', 'Royal Oak Offshore', 'Code 11.59', 'Millenary'],
+        'min_price': 15000,
+        'max_price': 200000
+    },
+    'Omega': {
+        'collections': ['Speedmaster', 'Seamaster', 'Constellation', 'De Ville'],
+        'min_price': 3000,
+        'max_price': 50000
+    },
+    'Cartier': {
+        'collections': ['Tank', 'Santos', 'Ballon Bleu', 'Pasha', 'Drive'],
+        'min_price': 4000,
+        'max_price': 80000
     }
+}
+
+# Case materials and sizes
+CASE_MATERIALS = ['Stainless Steel', 'Yellow Gold', 'White Gold', 'Rose Gold', 'Platinum', 'Titanium']
+CASE_SIZES = ['36mm', '38mm', '40mm', '41mm', '42mm', '44mm']
+
+# Condition descriptions
+CONDITIONS = ['Excellent', 'Very Good', 'Good', 'Fair']
+
+DIAL_COLORS = ['Black', 'White', 'Blue', 'Silver', 'Champagne']
+AUCTION_HOUSES = ['Christie\'s', 'Sotheby\'s', 'Phillips', 'Bonhams', 'Antiquorum']
+
+# we also need to add place holder images
+PLACEHOLDER_IMAGE = 'https://imageplaceholder.net/300'
+
+AUCTION_WINDOW_DAYS = 365 * 2  # Last 2 years
+
+# Rows per shard; shards are the unit of seeding, so the output for a given
+# seed depends on this and not on how many workers were used
+DEFAULT_SHARD_SIZE = 1_000_000
+
+# Rows per Arrow record batch / Parquet row group in streaming mode
+DEFAULT_BATCH_SIZE = 100_000
+
+# Arrow schema of the generated columns, fixed so every streamed batch matches
+WATCH_DATA_SCHEMA = pa.schema([
+    ('brand', pa.string()),
+    ('collection', pa.string()),
+    ('reference', pa.string()),
+    ('case_material', pa.string()),
+    ('case_size', pa.string()),
+    ('year', pa.int64()),
+    ('condition', pa.string()),
+    ('estimate_low', pa.int64()),
+    ('estimate_high', pa.int64()),
+    ('sold', pa.bool_()),
+    ('sold_price', pa.float64()),
+    ('auction_date', pa.string()),
+    ('has_box', pa.bool_()),
+    ('has_papers', pa.bool_()),
+    ('lot_number', pa.int64()),
+    ('movement', pa.string()),
+    ('dial_color', pa.string()),
+    ('auction_house', pa.string()),
+    ('image', pa.string()),
+    ('estimate', pa.string()),
+    ('previous_price', pa.float64()),
+])
 
-    # Case materials and sizes
-    case_materials = ['Stainless Steel', 'Yellow Gold', 'White Gold', 'Rose Gold', 'Platinum', 'Titanium']
-    case_sizes = ['36mm', '38mm', '40mm', '41mm', '42mm', '44mm']
 
-    # Condition descriptions
-    conditions = ['Excellent', 'Very Good', 'Good', 'Fair']
+def _choice(rng, options, num_records):
+    # Draw from a small list of labels by index, so we only ever copy pointers
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), num_records)]
+
+
+def _generate_columns(num_records, rng, start_date):
+    # Every column is drawn as a whole array in one pass, no per-record Python work
+    brands = list(WATCH_BRANDS)
+    brand_idx = rng.integers(0, len(brands), num_records)
+
+    # Collections differ in count per brand, so scale a uniform draw by the
+    # brand's collection count and offset into one flat lookup table
+    n_collections = np.array([len(WATCH_BRANDS[b]['collections']) for b in brands])
+    offsets = np.concatenate([[0], np.cumsum(n_collections)[:-1]])
+    all_collections = np.array(
+        [c for b in brands for c in WATCH_BRANDS[b]['collections']], dtype=object
+    )
+    collection_idx = offsets[brand_idx] + (rng.random(num_records) * n_collections[brand_idx]).astype(np.int64)
+
+    # Generate price details
+    min_prices = np.array([WATCH_BRANDS[b]['min_price'] for b in brands])
+    max_prices = np.array([WATCH_BRANDS[b]['max_price'] for b in brands])
+    base_price = rng.integers(min_prices[brand_idx], max_prices[brand_idx], endpoint=True)
+    estimate_low = (base_price * 0.9).astype(np.int64)
+    estimate_high = (base_price * 1.1).astype(np.int64)
+
+    # Determine if sold and final price, sometimes watches go for well above or below estimate
+    sold = rng.random(num_records) < 0.5
+    sold_price = np.where(
+        sold, (base_price * rng.uniform(0.7, 1.5, num_records)).astype(np.int64), np.nan
+    )
+    previous_price = sold_price / rng.integers(1, 4, num_records)  # This will choose from [1, 2, 3]
+
+    # Only 731 distinct auction days exist, so format those once and index into them
+    day_labels = (
+        np.datetime64(start_date.date()) + np.arange(AUCTION_WINDOW_DAYS + 1)
+    ).astype(str).astype(object)
+    auction_date = day_labels[rng.integers(0, AUCTION_WINDOW_DAYS + 1, num_records)]
+
+    estimate_code = np.select(
+        [sold_price > estimate_high, sold_price < estimate_low, sold], [1, 2, 3], default=0
+    )
+    estimate = np.array([None, 'higher', 'lower', 'wthin estimate'], dtype=object)[estimate_code]
+
+    return {
+        'brand': np.asarray(brands, dtype=object)[brand_idx],
+        'collection': all_collections[collection_idx],
+        'reference': rng.integers(100000, 1000000, num_records).astype(str).astype(object),
+        'case_material': _choice(rng, CASE_MATERIALS, num_records),
+        'case_size': _choice(rng, CASE_SIZES, num_records),
+        'year': rng.integers(1950, 2024, num_records, endpoint=True),
+        'condition': _choice(rng, CONDITIONS, num_records),
+        'estimate_low': estimate_low,
+        'estimate_high': estimate_high,
+        'sold': sold,
+        'sold_price': sold_price,
+        'auction_date': auction_date,
+        'has_box': rng.random(num_records) < 0.5,
+        'has_papers': rng.random(num_records) < 0.5,
+        'lot_number': rng.integers(1, 500, num_records, endpoint=True),
+        'movement': np.array(['Manual', 'Automatic'], dtype=object)[(rng.random(num_records) > 0.2).astype(np.int8)],
+        'dial_color': _choice(rng, DIAL_COLORS, num_records),
+        'auction_house': _choice(rng, AUCTION_HOUSES, num_records),
+        'image': np.full(num_records, PLACEHOLDER_IMAGE, dtype=object),
+        'estimate': estimate,
+        'previous_price': previous_price,
+    }
 
-    # Generate data
-    records = []
+
+def _auction_start_date():
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=365*2)  # Last 2 years
-
-    for _ in range(num_records):
-        # Select brand and collection
-        brand = random.choice(list(watch_data.keys()))
-        collection = random.choice(watch_data[brand]['collections'])
-        
-        # Generate reference number
-        ref_number = f"{random.randint(100000, 999999)}"
-        
-        # Generate year of manufacture
-        year = random.randint(1950, 2024)
-        
-        # Generate price details
-        base_price = random.randint(watch_data[brand]['min_price'], watch_data[brand]['max_price'])
-        estimate_low = int(base_price * 0.9)
-        estimate_high = int(base_price * 1.1)
-        
-        # Determine if sold and final price
-        sold = random.choice([True, False])
-        if sold:
-            # Sometimes watches go for well above or below estimate
-            price_multiplier = random.uniform(0.7, 1.5)
-            sold_price = int(base_price * price_multiplier)
-        else:
-            sold_price = None
-
-        if sold_price: 
-            previous_price = sold_price / np.random.choice(range(1, 4))  # This will choose from [1, 2, 3]
-        else: 
-            previous_price = None
-        # Generate auction date
-        auction_date = start_date + timedelta(days=random.randint(0, 365*2))
-        
-        # Generate additional details
-        has_box = random.choice([True, False])
-        has_papers = random.choice([True, False])
-        condition = random.choice(conditions)
-        case_material = random.choice(case_materials)
-        case_size = random.choice(case_sizes)
-
-        # we also need to add place holder images 
-        image = 'https://imageplaceholder.net/300'
-        
-        if sold_price is not None:
-            if sold_price > estimate_high:
-                estimate = 'higher'
-            elif sold_price < estimate_low:
-                estimate = 'lower'
-            else:
-                estimate = 'wthin estimate'
-        else: 
-            estimate = None
-
-        record = {
-            'brand': brand,
-            'collection': collection,
-            'reference': ref_number,
-            'case_material': case_material,
-            'case_size': case_size,
-            'year': year,
-            'condition': condition,
-            'estimate_low': estimate_low,
-            'estimate_high': estimate_high,
-            'sold': sold,
-            'sold_price': sold_price,
-            'auction_date': auction_date.strftime('%Y-%m-%d'),
-            'has_box': has_box,
-            'has_papers': has_papers,
-            'lot_number': random.randint(1, 500),
-            'movement': 'Automatic' if random.random() > 0.2 else 'Manual',
-            'dial_color': random.choice(['Black', 'White', 'Blue', 'Silver', 'Champagne']),
-            'auction_house': random.choice(['Christie\'s', 'Sotheby\'s', 'Phillips', 'Bonhams', 'Antiquorum']),
-            'image': image,
-            'estimate': estimate,
-            'previous_price': previous_price
-        }
-        records.append(record)
-
-    return pd.DataFrame(records)
+    return end_date - timedelta(days=AUCTION_WINDOW_DAYS)
+
+
+def _batch_rngs(num_records, batch_size, seed):
+    # Yields (rows, generator) per batch. Batch i is seeded from the child
+    # spawn_key + (i,) of the seed, derived without spawning so a SeedSequence
+    # passed in is left untouched and the same seed always gives the same rows,
+    # whether they end up in memory or on disk
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    for batch_no, offset in enumerate(range(0, num_records, batch_size)):
+        child = np.random.SeedSequence(
+            seed_seq.entropy,
+            spawn_key=seed_seq.spawn_key + (batch_no,),
+            pool_size=seed_seq.pool_size,
+        )
+        yield min(batch_size, num_records - offset), np.random.default_rng(child)
+
+
+def iter_watch_batches(num_records, batch_size=DEFAULT_BATCH_SIZE, seed=None, start_date=None):
+    # Yields the same columns as generate_watch_data as pyarrow RecordBatches
+    # of at most batch_size rows, so only one batch is ever alive at a time
+    start_date = start_date or _auction_start_date()
+    for n, rng in _batch_rngs(num_records, batch_size, seed):
+        columns = _generate_columns(n, rng, start_date)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(columns[f.name], type=f.type, from_pandas=True) for f in WATCH_DATA_SCHEMA],
+            schema=WATCH_DATA_SCHEMA,
+        )
+
+
+def write_watch_data(path, num_records, batch_size=DEFAULT_BATCH_SIZE, seed=None, start_date=None):
+    # Streams the batches into a single Parquet file, one row group per batch,
+    # so files larger than RAM can be produced with bounded memory
+    with pq.ParquetWriter(path, WATCH_DATA_SCHEMA) as writer:
+        for batch in iter_watch_batches(num_records, batch_size, seed, start_date):
+            writer.write_batch(batch)
+    return path
+
+
+def _shard_sizes(num_records, shard_size):
+    full, rest = divmod(num_records, shard_size)
+    return [shard_size] * full + ([rest] if rest or not full else [])
+
+
+def _generate_shard(num_records, seed_seq, start_date, path=None):
+    # Runs in a worker process; with a path the shard is streamed straight to
+    # disk batch by batch and only the file name travels back to the parent
+    if path is None:
+        frames = [
+            pd.DataFrame(_generate_columns(n, rng, start_date))
+            for n, rng in _batch_rngs(num_records, DEFAULT_BATCH_SIZE, seed_seq)
+        ]
+        if not frames:
+            # No rows means no batches, still hand back the full set of columns
+            return pd.DataFrame(_generate_columns(0, np.random.default_rng(seed_seq), start_date))
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return write_watch_data(path, num_records, seed=seed_seq, start_date=start_date)
+
+
+def generate_watch_data(num_records=100, seed=None, workers=1, output_dir=None, shard_size=DEFAULT_SHARD_SIZE):
+    # seed makes the output reproducible, None draws fresh entropy like before.
+    # The rows are split into shards of shard_size, each with its own child
+    # seed spawned from the seed, and the shards are generated across
+    # `workers` processes (None uses every core).
+    # Without output_dir the shards are concatenated into one DataFrame. With
+    # output_dir each shard is written as its own part-NNNNN.parquet file and
+    # the list of paths is returned, so the full frame is never held in memory.
+    start_date = _auction_start_date()
+
+    sizes = _shard_sizes(num_records, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        paths = [os.path.join(output_dir, f"part-{i:05d}.parquet") for i in range(len(sizes))]
+    else:
+        paths = [None] * len(sizes)
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(sizes) == 1:
+        shards = [_generate_shard(n, s, start_date, p) for n, s, p in zip(sizes, seeds, paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            shards = list(pool.map(_generate_shard, sizes, seeds, [start_date] * len(sizes), paths))
+
+    if output_dir is not None:
+        return shards
+    return shards[0] if len(shards) == 1 else pd.concat(shards, ignore_index=True)
+
+def ensure_watch_data(name='auctions', num_records=1000, seed=None):
+    # Generates a dataset into the data root the first time it is needed, so
+    # pages can scan it from disk like any other parquet dataset
+    path = dataset_path(name)
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        write_watch_data(tmp, num_records, seed=seed)
+        os.replace(tmp, path)
+    return path
 
 def read_fake_data():
-    df = pd.read_parquet('/Users/sachabanks/Desktop/data-dudes-dash/data/fakedata.parquet')
-    return df
\ No newline at end of file
+    # Served from the process-wide dataset cache, the file is only re-read when it changes
+    return get_frame('fakedata')
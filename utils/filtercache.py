@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built = False
+        self.value = None
+
+
+class FilterCache:
+    # LRU of filtered results keyed on a hashable filter state. The callbacks
+    # fed by one set of filters all fire together: the first one to ask for a
+    # key builds the result while the others wait on that entry and reuse it,
+    # so each filter state is computed once however many outputs depend on it
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, builder):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        with entry.lock:
+            # A builder that raised leaves the entry unbuilt for the next caller
+            if not entry.built:
+                entry.value = builder()
+                entry.built = True
+            return entry.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,52 @@
+import polars as pl
+
+from utils.datastore import dataset_path
+
+# Auction results used by the dashboard and data explorer pages, written at
+# start-up by app.create_app (see utils.fakedata.ensure_watch_data)
+AUCTIONS_DATASET = 'auctions'
+
+
+def auction_predicates(brands=None, years=None, auction_houses=None, box_papers=(), prices=None):
+    # The dashboard filters as polars expressions, empty filters are skipped
+    predicates = []
+    if brands:
+        predicates.append(pl.col('brand').is_in(list(brands)))
+    if years:
+        predicates.append(pl.col('year').is_between(years[0], years[1]))
+    if auction_houses:
+        predicates.append(pl.col('auction_house').is_in(list(auction_houses)))
+    if box_papers and 'has_box' in box_papers:
+        predicates.append(pl.col('has_box'))
+    if box_papers and 'has_papers' in box_papers:
+        predicates.append(pl.col('has_papers'))
+    if prices:
+        predicates.append(pl.col('sold_price').is_between(prices[0], prices[1]))
+    return predicates
+
+
+def auction_filters(brands=None, years=None, auction_houses=None, box_papers=(), prices=None):
+    # The same filters as a hashable, order-independent tuple of (name, value)
+    # pairs with empty filters left out, for use as a cache key.
+    # dict(auction_filters(...)) gives back keyword arguments for the queries
+    filters = (
+        ('brands', tuple(sorted(brands)) if brands else None),
+        ('years', tuple(years) if years else None),
+        ('auction_houses', tuple(sorted(auction_houses)) if auction_houses else None),
+        ('box_papers', tuple(sorted(box_papers)) if box_papers else None),
+        ('prices', tuple(prices) if prices else None),
+    )
+    return tuple((name, value) for name, value in filters if value is not None)
+
+
+def query_auctions(columns=None, name=AUCTIONS_DATASET, **filters):
+    # A LazyFrame over the parquet file. Polars pushes the filter and the
+    # column selection down into the scan, so only the requested columns of
+    # matching row groups are ever read
+    lazy = pl.scan_parquet(dataset_path(name))
+    predicates = auction_predicates(**filters)
+    if predicates:
+        lazy = lazy.filter(pl.all_horizontal(predicates))
+    if columns:
+        lazy = lazy.select(columns)
+    return lazy
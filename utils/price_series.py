@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from utils.datastore import get_dataset
+from utils.lazyquery import AUCTIONS_DATASET
+
+
+def _month_start(days):
+    return days.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _week_start(days):
+    # Weeks start on Monday; day 0 of datetime64, 1970-01-01, was a Thursday
+    offset = (days.astype(np.int64) + 3) % 7
+    return days - offset.astype('timedelta64[D]')
+
+
+# Bucket width -> function giving the first day of each date's bucket
+BUCKETS = {
+    'M': _month_start,
+    'W': _week_start,
+}
+
+
+class PriceSeries:
+    # Average sold price per time bucket, materialized for every brand,
+    # auction house and year: per (brand, house, year, bucket) the number of
+    # auctions, the number with a price and the price sum. A trend for brand,
+    # house and year filters is a sum over a sub-block of cells; the box and
+    # papers filters fall back to a bincount of the matching rows over the
+    # precomputed bucket codes, so dates are never parsed, sorted or grouped
+    # per request
+
+    def __init__(self, df, freq='M'):
+        days = df['auction_date'].to_numpy(dtype='datetime64[D]')
+        dated = ~np.isnat(days)
+        self.dates, codes = np.unique(BUCKETS[freq](days[dated]), return_inverse=True)
+
+        # Rows without a date belong to no bucket and are left out
+        self.codes = np.full(len(df), -1, dtype=np.intp)
+        self.codes[dated] = codes
+        prices = df['sold_price'].to_numpy(dtype=float)
+        self.priced = ~np.isnan(prices) & dated
+        self.prices = np.where(self.priced, prices, 0.0)
+
+        brand_codes, self.brands = pd.factorize(df['brand'], sort=True)
+        house_codes, self.auction_houses = pd.factorize(df['auction_house'], sort=True)
+        self.years, year_codes = np.unique(df['year'].to_numpy(), return_inverse=True)
+        keep = dated & (brand_codes >= 0) & (house_codes >= 0)
+        self.shape = (len(self.brands), len(self.auction_houses), len(self.years), len(self.dates))
+        cells = np.ravel_multi_index(
+            (brand_codes[keep], house_codes[keep], year_codes[keep], self.codes[keep]), self.shape
+        )
+        size = int(np.prod(self.shape))
+        self.rows = np.bincount(cells, minlength=size).reshape(self.shape)
+        self.counts = np.bincount(cells, weights=self.priced[keep], minlength=size).reshape(self.shape)
+        self.totals = np.bincount(cells, weights=self.prices[keep], minlength=size).reshape(self.shape)
+
+    def _select(self, cube, brands, years, auction_houses):
+        if brands:
+            cube = cube[np.flatnonzero(self.brands.isin(list(brands)))]
+        if auction_houses:
+            cube = cube[:, np.flatnonzero(self.auction_houses.isin(list(auction_houses)))]
+        if years:
+            cube = cube[:, :, np.searchsorted(self.years, years[0], side='left'):
+                        np.searchsorted(self.years, years[1], side='right')]
+        return cube.sum(axis=(0, 1, 2))
+
+    def series(self, brands=None, years=None, auction_houses=None):
+        # (bucket start dates, average price) for buckets with auctions in them
+        rows = self._select(self.rows, brands, years, auction_houses)
+        counts = self._select(self.counts, brands, years, auction_houses)
+        totals = self._select(self.totals, brands, years, auction_houses)
+        return self._average(rows, counts, totals)
+
+    def series_for(self, positions):
+        # The same for any set of row positions, e.g. from AuctionFilter
+        codes = self.codes[positions]
+        dated = codes >= 0
+        codes = codes[dated]
+        size = len(self.dates)
+        rows = np.bincount(codes, minlength=size)
+        counts = np.bincount(codes, weights=self.priced[positions][dated], minlength=size)
+        totals = np.bincount(codes, weights=self.prices[positions][dated], minlength=size)
+        return self._average(rows, counts, totals)
+
+    def _average(self, rows, counts, totals):
+        # A bucket whose auctions all went unsold averages to NaN, a gap in the line
+        present = rows > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = totals[present] / counts[present]
+        return self.dates[present], average
+
+
+def get_price_series(freq='M', name=AUCTIONS_DATASET):
+    return get_dataset(name).derived(
+        ('price_series', freq), lambda dataset: PriceSeries(dataset.df, freq)
+    )
@@ -0,0 +1,33 @@
+from utils.datastore import DEFAULT_DATASET, get_dataset
+
+
+class RowIndex:
+    # Primary-key lookup built once per frame: a dict from key to row position
+    # plus the column arrays, so fetching one watch is a dict hit and one
+    # element per column instead of a boolean scan over the whole frame.
+    # Without the key column the row position itself is the key
+
+    def __init__(self, df, key='id'):
+        self.key = key
+        # .array keeps Arrow-backed columns as they are instead of copying them to objects
+        self.columns = {c: df[c].array for c in df.columns}
+        keys = df[key].tolist() if key in df.columns else range(len(df))
+        self._positions = dict(zip(keys, range(len(df))))
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def position(self, key):
+        return self._positions[key]
+
+    def record(self, key):
+        # Raises KeyError for unknown keys, like a dict
+        position = self._positions[key]
+        return {c: values[position] for c, values in self.columns.items()}
+
+
+def get_row_index(name=DEFAULT_DATASET, key='id'):
+    return get_dataset(name).derived(('row_index', key), lambda dataset: RowIndex(dataset.df, key))
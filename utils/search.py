@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.datastore import DEFAULT_DATASET, get_dataset
+
+# Longest n-gram kept in the index; queries up to this length are a single
+# posting lookup, longer ones intersect their n-grams and then verify
+GRAM_SIZE = 3
+
+# Low-cardinality text columns get an n-gram index over their distinct values,
+# the reference column is close to unique per row so it gets a prefix index
+NGRAM_FIELDS = ('name', 'brand')
+PREFIX_FIELDS = ('reference',)
+
+# Recent queries kept per index, repeated or re-sent queries (paging, several
+# users typing the same brand) are answered without touching the fields
+SEARCH_CACHE_SIZE = 64
+
+
+def _grams(text):
+    return {text[i:i + n] for n in range(1, GRAM_SIZE + 1) for i in range(len(text) - n + 1)}
+
+
+class _NgramField:
+    # n-gram postings over the distinct lowercased values of one column, plus
+    # a CSR style mapping from each distinct value to the rows that hold it
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(values.fillna('').astype(str).str.lower())
+        self.uniques = np.asarray(uniques, dtype=object)
+        self.row_order = np.argsort(codes, kind='stable')
+        self.row_starts = np.searchsorted(codes[self.row_order], np.arange(len(self.uniques) + 1))
+
+        postings = {}
+        for code, text in enumerate(self.uniques):
+            for gram in _grams(text):
+                postings.setdefault(gram, []).append(code)
+        self.postings = {gram: np.array(codes, dtype=np.int64) for gram, codes in postings.items()}
+
+    def matching_values(self, query):
+        if len(query) <= GRAM_SIZE:
+            return self.postings.get(query, np.empty(0, dtype=np.int64))
+        grams = sorted(
+            (self.postings.get(query[i:i + GRAM_SIZE], np.empty(0, dtype=np.int64))
+             for i in range(len(query) - GRAM_SIZE + 1)),
+            key=len,
+        )
+        candidates = grams[0]
+        for posting in grams[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array([c for c in candidates if query in self.uniques[c]], dtype=np.int64)
+
+    def rows(self, query):
+        values = self.matching_values(query)
+        if not len(values):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.row_order[self.row_starts[v]:self.row_starts[v + 1]] for v in values])
+
+
+class _PrefixField:
+    # Sorted lowercased values, a prefix query is two binary searches
+
+    def __init__(self, values):
+        lowered = values.fillna('').astype(str).str.lower().to_numpy(dtype=str)
+        self.row_order = np.argsort(lowered, kind='stable')
+        self.sorted_values = lowered[self.row_order]
+
+    def rows(self, query):
+        # Compare in the array's own fixed-width dtype, a wider query string
+        # would make numpy cast the whole sorted array on every lookup
+        dtype = self.sorted_values.dtype
+        width = dtype.itemsize // 4  # numpy stores unicode as UCS4
+        if len(query) > width:
+            return np.empty(0, dtype=np.int64)
+        lo = np.searchsorted(self.sorted_values, np.array(query, dtype=dtype), side='left')
+        if len(query) == width:
+            hi = np.searchsorted(self.sorted_values, np.array(query, dtype=dtype), side='right')
+        else:
+            hi = np.searchsorted(self.sorted_values, np.array(query + '\uffff', dtype=dtype), side='left')
+        return self.row_order[lo:hi]
+
+
+class SearchIndex:
+    # Built once per dataset version; search() returns matching row positions
+    # (in frame order) without touching the frame itself
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.fields = [_NgramField(df[c]) for c in NGRAM_FIELDS if c in df.columns]
+        self.fields += [_PrefixField(df[c]) for c in PREFIX_FIELDS if c in df.columns]
+        self._cached_search = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search)
+
+    def _search(self, query):
+        mask = np.zeros(self.size, dtype=bool)
+        for field in self.fields:
+            mask[field.rows(query)] = True
+        positions = np.flatnonzero(mask)
+        positions.flags.writeable = False  # shared between callers through the cache
+        return positions
+
+    def search(self, query, limit=None):
+        query = (query or '').strip().lower()
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        positions = self._cached_search(query)
+        return positions if limit is None else positions[:limit]
+
+
+def get_search_index(name=DEFAULT_DATASET):
+    return get_dataset(name).derived('search_index', lambda dataset: SearchIndex(dataset.df))
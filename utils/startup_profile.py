@@ -0,0 +1,145 @@
+import argparse
+import importlib
+import importlib.machinery
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Startup profile of the dash app: wall time and resident memory added by
+# each heavy import, each registered page module and the app as a whole.
+# Run it in a fresh interpreter so nothing is imported yet:
+#
+#   python -m utils.startup_profile
+#   python -m utils.startup_profile --budget total=3 --budget pandas=0.8 --max-mb 300
+#
+# It exits with status 1 when any budget is exceeded, so it can run as a check
+
+# Imported one by one before the app, in this order, so each line shows what
+# that library adds on top of the ones above it
+HEAVY_IMPORTS = [
+    'numpy',
+    'pandas',
+    'pyarrow',
+    'plotly.graph_objs',
+    'plotly.express',
+    'dash',
+    'dash_bootstrap_components',
+]
+
+APP_MODULE = 'app'
+
+
+def _rss_mb():
+    # Current resident set size; /proc on Linux, peak RSS elsewhere
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class _Measure:
+    def __init__(self, results, name):
+        self.results = results
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.rss = _rss_mb()
+        return self
+
+    def __exit__(self, *exc):
+        self.results.append((self.name, time.perf_counter() - self.start, _rss_mb() - self.rss))
+
+
+def _time_page_imports(results):
+    # Dash execs each page module itself while the app is created, so time
+    # the source loader for modules under pages/
+    original = importlib.machinery.SourceFileLoader.exec_module
+
+    def exec_module(loader, module):
+        if not module.__name__.startswith('pages.'):
+            return original(loader, module)
+        with _Measure(results, module.__name__):
+            return original(loader, module)
+
+    importlib.machinery.SourceFileLoader.exec_module = exec_module
+    return original
+
+
+def profile_startup(heavy_imports=HEAVY_IMPORTS, app_module=APP_MODULE):
+    # Returns a list of (name, seconds, MB) rows, the last one is the total
+    results = []
+    start = time.perf_counter()
+    rss = _rss_mb()
+
+    for name in heavy_imports:
+        with _Measure(results, name):
+            importlib.import_module(name)
+
+    pages = []
+    original = _time_page_imports(pages)
+    try:
+        with _Measure(results, app_module):
+            importlib.import_module(app_module)
+    finally:
+        importlib.machinery.SourceFileLoader.exec_module = original
+    results.extend(pages)
+
+    results.append(('total', time.perf_counter() - start, _rss_mb() - rss))
+    return results
+
+
+def check_budgets(results, budgets, max_mb=None):
+    # Returns a message per exceeded budget; budgets maps a row name to seconds
+    measured = {name: (seconds, mb) for name, seconds, mb in results}
+    failures = []
+    for name, limit in budgets.items():
+        if name not in measured:
+            failures.append(f"{name}: no such entry in the profile")
+        elif measured[name][0] > limit:
+            failures.append(f"{name}: {measured[name][0]:.3f}s over budget of {limit:.3f}s")
+    if max_mb is not None and measured['total'][1] > max_mb:
+        failures.append(f"total: {measured['total'][1]:.1f} MB over budget of {max_mb:.1f} MB")
+    return failures
+
+
+def format_report(results):
+    lines = [f"{'startup step':<40}{'seconds':>10}{'MB':>10}"]
+    for name, seconds, mb in results:
+        label = f"  {name}" if name.startswith('pages.') else name
+        lines.append(f"{label:<40}{seconds:>10.3f}{mb:>10.1f}")
+    return '\n'.join(lines)
+
+
+def _parse_budget(value):
+    name, _, seconds = value.partition('=')
+    if not seconds:
+        raise argparse.ArgumentTypeError(f"expected NAME=SECONDS, got {value!r}")
+    return name, float(seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile the start-up cost of the dash app.')
+    parser.add_argument(
+        '--budget', action='append', type=_parse_budget, default=[], metavar='NAME=SECONDS',
+        help="time budget for one row of the report, e.g. total=3 or pages.watch_collection=0.2",
+    )
+    parser.add_argument('--max-mb', type=float, help='budget for the total resident memory added')
+    args = parser.parse_args(argv)
+
+    results = profile_startup()
+    print(format_report(results))
+
+    failures = check_budgets(results, dict(args.budget), args.max_mb)
+    for failure in failures:
+        print(f"BUDGET EXCEEDED {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import math
+
+import polars as pl
+
+# Server-side backend for a dash DataTable with page_action, sort_action and
+# filter_action set to 'custom': the table sends its page, sort and filter
+# state and only the rows of the visible page come back
+
+# Operators of the table's filter row, in the order they are tried, since
+# '>=' has to be matched before '>' and '='
+FILTER_OPERATORS = [
+    ('ge ', '>='),
+    ('le ', '<='),
+    ('lt ', '<'),
+    ('gt ', '>'),
+    ('ne ', '!='),
+    ('eq ', '='),
+    ('contains ',),
+    ('datestartswith ',),
+]
+
+
+def _split_filter_part(filter_part):
+    # '{year} >= 2000' -> ('year', 'ge', '2000'), None when it can't be read
+    for operators in FILTER_OPERATORS:
+        for operator in operators:
+            if operator not in filter_part:
+                continue
+            name_part, value_part = filter_part.split(operator, 1)
+            name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+            value = value_part.strip()
+            if value and value[0] == value[-1] and value[0] in ('"', "'", '`'):
+                value = value[1:-1].replace('\\' + value[0], value[0])
+            return name, operators[0].strip(), value
+    return None
+
+
+def filter_expressions(filter_query, schema):
+    # Polars expressions for a DataTable filter_query; parts naming unknown
+    # columns or comparing a number column to text are ignored
+    expressions = []
+    for filter_part in (filter_query or '').split(' && '):
+        parsed = _split_filter_part(filter_part)
+        if parsed is None or parsed[0] not in schema:
+            continue
+        name, operator, value = parsed
+        column = pl.col(name)
+        if operator in ('contains', 'datestartswith'):
+            text = column.cast(pl.String)
+            expressions.append(
+                text.str.contains(value, literal=True) if operator == 'contains'
+                else text.str.starts_with(value)
+            )
+            continue
+        if schema[name].is_numeric():
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+        else:
+            column = column.cast(pl.String)
+        expressions.append({
+            'ge': column >= value,
+            'le': column <= value,
+            'lt': column < value,
+            'gt': column > value,
+            'ne': column != value,
+            'eq': column == value,
+        }[operator])
+    return expressions
+
+
+def apply_filter_query(lazy, filter_query):
+    expressions = filter_expressions(filter_query, lazy.collect_schema())
+    if expressions:
+        lazy = lazy.filter(pl.all_horizontal(expressions))
+    return lazy
+
+
+def table_page(lazy, page_current=0, page_size=10, sort_by=None, filter_query=None):
+    # Returns (records of the requested page, page count). The count and the
+    # page are collected together so polars scans the source once
+    lazy = apply_filter_query(lazy, filter_query)
+    if sort_by:
+        lazy = lazy.sort(
+            [sort['column_id'] for sort in sort_by],
+            descending=[sort['direction'] == 'desc' for sort in sort_by],
+            nulls_last=True,
+            maintain_order=True,
+        )
+    page_current = page_current or 0
+    page, count = pl.collect_all([
+        lazy.slice(page_current * page_size, page_size),
+        lazy.select(pl.len()),
+    ])
+    return page.to_dicts(), max(math.ceil(count.item() / page_size), 1)
@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def top_k(values, k, positions=None):
+    # Positions of the k largest values, largest first, without sorting the
+    # rest: argpartition moves the k largest to the front in O(n) and only
+    # those k are sorted. positions optionally restricts the candidates to
+    # those rows and the result is given in the same frame positions.
+    # NaNs rank below every number, as they do in a descending sort_values
+    candidates = values if positions is None else values[positions]
+    k = min(k, len(candidates))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    # Negated so the largest come first; NaN stays NaN and partitions last
+    keys = -np.asarray(candidates, dtype=float)
+    top = np.argpartition(keys, k - 1)[:k] if k < len(keys) else np.arange(len(keys))
+    top = top[np.argsort(keys[top], kind='stable')]
+    return top if positions is None else np.asarray(positions)[top]